@@ -0,0 +1,257 @@
+import sys
+import types
+from contextlib import contextmanager
+
+import numpy as np
+
+# Lightweight stand-ins for the parts of bpy, gpu, blf, gpu_extras and mathutils the add-on touches.
+# Drawing calls do nothing, so the benchmarks only measure the add-on's own Python work.
+
+def noop(*args, **kwargs):
+	pass
+
+class Struct:
+	def __init__(self, **kwargs):
+		self.__dict__.update(kwargs)
+
+	def as_pointer(self):
+		return id(self)
+
+class Collection(list):
+	def __getitem__(self, key):
+		if isinstance(key, str):
+			item = self.get(key)
+			if item is None:
+				raise KeyError(key)
+			return item
+		return super().__getitem__(key)
+
+	def get(self, name, default=None):
+		for item in self:
+			if item.name == name:
+				return item
+		return default
+
+	def keys(self):
+		return [item.name for item in self]
+
+class Recorder:
+	# Accepts any method call, used for builders whose result is never looked at.
+	def __getattr__(self, name):
+		return noop
+
+# mathutils
+
+class Vector(list):
+	def __add__(self, other):
+		return Vector(a + b for a, b in zip(self, other))
+
+	__iadd__ = __add__
+
+	def copy(self):
+		return Vector(self)
+
+	def __matmul__(self, matrix):
+		return Vector(sum(self[i] * matrix[i][j] for i in range(len(self))) for j in range(len(self)))
+
+class Quaternion:
+	# Kept as the rotation matrix it came from, only rotating vectors is needed.
+	def __init__(self, rows):
+		self.rows = rows
+
+	def __matmul__(self, vector):
+		return Vector(sum(row[i] * vector[i] for i in range(3)) for row in self.rows)
+
+class Matrix(list):
+	def __init__(self, rows=()):
+		super().__init__(list(row) for row in rows)
+
+	@classmethod
+	def Identity(cls, size):
+		return cls(np.identity(size).tolist())
+
+	@classmethod
+	def Translation(cls, vector):
+		matrix = cls.Identity(4)
+		matrix[0][3], matrix[1][3], matrix[2][3] = vector
+		return matrix
+
+	@classmethod
+	def Rotation(cls, angle, size, axis):
+		cos, sin = np.cos(angle), np.sin(angle)
+		matrix = cls.Identity(size)
+		a, b = {'X': (1, 2), 'Y': (2, 0), 'Z': (0, 1)}[axis]
+		matrix[a][a], matrix[a][b], matrix[b][a], matrix[b][b] = cos, -sin, sin, cos
+		return matrix
+
+	def copy(self):
+		return Matrix(self)
+
+	def to_quaternion(self):
+		return Quaternion([row[:3] for row in self[:3]])
+
+	def inverted(self):
+		return Matrix(np.linalg.inv(np.array(self)).tolist())
+
+	def invert(self):
+		self[:] = self.inverted()
+
+	def __matmul__(self, other):
+		return Matrix((np.array(self) @ np.array(other)).tolist())
+
+# gpu
+
+class ReadBuffer(list):
+	@property
+	def dimensions(self):
+		return len(self)
+
+	@dimensions.setter
+	def dimensions(self, size):
+		self[:] = [0.5] * size
+
+class Texture:
+	def __init__(self, width, height):
+		self.width = width
+		self.height = height
+
+	def read(self):
+		return ReadBuffer()
+
+class GPUOffScreen:
+	def __init__(self, width, height, format='RGBA8'):
+		self.width = width
+		self.height = height
+		self.format = format
+		self.texture_color = Texture(width, height)
+
+	def draw_view3d(self, *args, **kwargs):
+		pass
+
+	@contextmanager
+	def bind(self):
+		yield self
+
+	def free(self):
+		pass
+
+class Shader:
+	bind = noop
+	uniform_float = noop
+	uniform_int = noop
+	uniform_bool = noop
+	uniform_sampler = noop
+
+class Batch:
+	def __init__(self, shader, type, content, indices=None):
+		self.content = content
+
+	draw = noop
+
+builtin_shaders = {}
+
+def from_builtin(name):
+	shader = builtin_shaders.get(name)
+	if shader is None:
+		shader = builtin_shaders[name] = Shader()
+	return shader
+
+@contextmanager
+def push_pop():
+	yield
+
+# bpy.types
+
+class Operator:
+	def report(self, type, message):
+		pass
+
+class Gizmo:
+	registry = {}
+
+	def __init_subclass__(cls, **kwargs):
+		super().__init_subclass__(**kwargs)
+		Gizmo.registry[cls.bl_idname] = cls
+
+	def __init__(self):
+		self.matrix_basis = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+		self.hide = False
+		self.scale_basis = 1.0
+
+	def target_set_operator(self, idname):
+		return Struct()
+
+class Gizmos(list):
+	def new(self, idname):
+		cls = Gizmo.registry.get(idname, Gizmo)
+		gizmo = cls()
+		if cls is not Gizmo:
+			gizmo.setup()
+		self.append(gizmo)
+		return gizmo
+
+class GizmoGroup:
+	def __init__(self):
+		self.gizmos = Gizmos()
+
+class Timers:
+	def __init__(self):
+		self.registered = set()
+
+	def register(self, function, first_interval=0, persistent=False):
+		self.registered.add(function)
+
+	def unregister(self, function):
+		self.registered.discard(function)
+
+	def is_registered(self, function):
+		return function in self.registered
+
+def module(name, **attributes):
+	result = types.ModuleType(name)
+	result.__dict__.update(attributes)
+	sys.modules[name] = result
+	return result
+
+def install():
+	props = {name: (lambda name: lambda **kwargs: (name, kwargs))(name) for name in (
+		'BoolProperty', 'IntProperty', 'FloatProperty', 'StringProperty', 'EnumProperty',
+		'FloatVectorProperty', 'PointerProperty', 'CollectionProperty',
+	)}
+
+	handlers = module('bpy.app.handlers', persistent=lambda function: function)
+	for name in ('load_post', 'depsgraph_update_post', 'frame_change_post', 'undo_post', 'redo_post'):
+		setattr(handlers, name, [])
+	app = module('bpy.app', handlers=handlers, driver_namespace={}, version=(4, 4, 0), timers=Timers())
+
+	bpy = module('bpy',
+		app=app,
+		props=module('bpy.props', **props),
+		types=module('bpy.types',
+			Operator=Operator, Panel=object, PropertyGroup=object, AddonPreferences=object,
+			Gizmo=Gizmo, GizmoGroup=GizmoGroup, Screen=Struct, Scene=Struct, SpaceView3D=Struct, Object=Struct, Collection=Struct, LayerObjects=Struct,
+		),
+		msgbus=Recorder(),
+		utils=Recorder(),
+		path=Struct(abspath=lambda path: path),
+		data=Struct(screens=Collection(), objects=Collection(), images=Collection()),
+		context=None,
+		ops=Recorder(),
+	)
+
+	gpu = module('gpu',
+		types=module('gpu.types', GPUOffScreen=GPUOffScreen, GPUTexture=lambda size, **kwargs: Struct(size=size), Buffer=lambda type, size, data=None: data, GPUStageInterfaceInfo=lambda name: Recorder(), GPUShaderCreateInfo=Recorder),
+		shader=module('gpu.shader', from_builtin=from_builtin, create_from_info=lambda info: Shader()),
+		state=module('gpu.state', blend_set=noop, line_width_set=noop, point_size_set=noop, active_framebuffer_get=lambda: Recorder()),
+		matrix=module('gpu.matrix', push_pop=push_pop, push_pop_projection=push_pop, load_identity=noop, load_projection_matrix=noop),
+		select=module('gpu.select', load_id=noop),
+	)
+
+	module('blf', SHADOW=1 << 2,
+		enable=noop, disable=noop, color=noop, size=noop, position=noop, draw=noop,
+		dimensions=lambda font_id, text: (len(text) * 8.0, 12.0),
+	)
+	module('gpu_extras', batch=module('gpu_extras.batch', batch_for_shader=Batch))
+	module('mathutils', Vector=Vector, Matrix=Matrix, Quaternion=Quaternion)
+
+	return bpy, gpu
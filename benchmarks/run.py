@@ -0,0 +1,356 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import blender_stubs
+from blender_stubs import Struct, Collection, Vector, Matrix, noop
+
+bpy, gpu = blender_stubs.install()
+
+import camera_viewer
+
+property_defaults = {
+	'BoolProperty': False, 'IntProperty': 0, 'FloatProperty': 0.0, 'StringProperty': '',
+	'FloatVectorProperty': (0.0, 0.0, 0.0), 'PointerProperty': None,
+}
+
+def make_props(cls, **overrides):
+	# Instances carry the declared defaults, so new properties show up here without touching the harness.
+	values = {}
+	for name, (type, options) in cls.__annotations__.items():
+		if 'default' in options:
+			values[name] = options['default']
+		elif type == 'EnumProperty':
+			values[name] = options['items'][0][0]
+		elif type == 'CollectionProperty':
+			values[name] = Collection()
+		else:
+			values[name] = property_defaults.get(type)
+	values.update(overrides)
+	return Struct(**values)
+
+def make_camera(name, index):
+	matrix = Matrix.Identity(4)
+	matrix[0][3], matrix[1][3], matrix[2][3] = index * 2.0, -10.0, 1.5
+	return Struct(
+		name=name,
+		type='CAMERA',
+		mode='OBJECT',
+		data=Struct(
+			type='PERSP', lens=50.0, ortho_scale=6.0, sensor_fit='AUTO', sensor_width=36.0, sensor_height=24.0,
+			shift_x=0.0, shift_y=0.0, clip_start=0.1, clip_end=100.0,
+			stereo=Struct(convergence_mode='OFFAXIS', convergence_distance=1.95, interocular_distance=0.065, pivot='LEFT'),
+		),
+		matrix_world=matrix,
+		location=Vector((index * 2.0, -10.0, 1.5)),
+		rotation_euler=Vector((1.4, 0.0, 0.0)),
+		calc_matrix_camera=lambda depsgraph, x=1, y=1: Matrix.Identity(4),
+	)
+
+def make_space():
+	shading = Struct(**{key: None for key in camera_viewer.shading_keys})
+	shading.type = 'SOLID'
+	shading.use_compositor = 'DISABLED'
+	overlay = Struct(**{key: None for key in camera_viewer.overlay_keys})
+	overlay.show_overlays = True
+	return Struct(shading=shading, overlay=overlay, region_3d=Struct(view_perspective='PERSP'))
+
+def build_scene(viewers=2, cameras=6):
+	objects = Collection(make_camera(f'Camera.{index:03d}', index) for index in range(cameras))
+	bpy.data.objects[:] = objects
+
+	scene = Struct(
+		name='Scene',
+		camera=objects[0],
+		objects=objects,
+		frame_current=1,
+		frame_subframe=0.0,
+		sync_mode='AUDIO_SYNC',
+		use_nodes=False,
+		compositing_node_group=None,
+		render=Struct(resolution_x=1920, resolution_y=1080, pixel_aspect_x=1.0, pixel_aspect_y=1.0, engine='BLENDER_EEVEE_NEXT',
+			use_multiview=False, views_format='STEREO_3D'),
+		tool_settings=Struct(use_keyframe_insert_auto=False),
+		view_settings=Struct(view_transform='AgX', look='None', exposure=0.0, gamma=1.0, use_curve_mapping=False),
+		display_settings=Struct(display_device='sRGB'),
+		safe_areas=Struct(title=(0.1, 0.05), action=(0.035, 0.035)),
+		camera_viewer_ui=make_props(camera_viewer.Camera_Viewer_UI_Props),
+	)
+
+	region = Struct(type='WINDOW', width=1600, height=900)
+	area = Struct(
+		type='VIEW_3D',
+		regions=[Struct(type='TOOLS', width=40), Struct(type='UI', width=300), region],
+		spaces=[make_space()],
+		tag_redraw=noop,
+	)
+
+	positions = ('Left-Bottom', 'Right-Bottom', 'Left-Top', 'Right-Top')
+	screen = Struct(name='Layout', areas=[area], is_animation_playing=False)
+	screen.camera_viewer = make_props(camera_viewer.Camera_Viewer_Props, viewer_toggle=True, camera_object=objects[0])
+	screen.camera_viewers = Collection(
+		make_props(camera_viewer.Camera_Viewer_Props, viewer_toggle=True, camera_object=objects[index % cameras], lock_camera=True, position=positions[index % 4])
+		for index in range(1, viewers)
+	)
+
+	bpy.data.screens[:] = [screen]
+	for camera_viewer_props in camera_viewer.get_viewers(screen):
+		name = camera_viewer.new_viewer_screen_name(screen, camera_viewer_props)
+		camera_viewer_props.space_screen = name
+		bpy.data.screens.append(Struct(
+			name=name, areas=[Struct(type='VIEW_3D', spaces=[make_space()])], is_animation_playing=False,
+			camera_viewer=make_props(camera_viewer.Camera_Viewer_Props), camera_viewers=Collection(),
+		))
+
+	window = Struct(screen=screen)
+	context = Struct(
+		screen=screen,
+		scene=scene,
+		region=region,
+		area=area,
+		space_data=area.spaces[0],
+		active_object=objects[0],
+		object=objects[0],
+		view_layer=Struct(name='ViewLayer', use=True),
+		window=window,
+		preferences=Struct(system=Struct(ui_scale=1.0)),
+		window_manager=Struct(windows=[window], modal_handler_add=noop, event_timer_add=lambda interval, window=None: Struct(time_delta=interval), event_timer_remove=noop),
+		evaluated_depsgraph_get=lambda: None,
+	)
+	bpy.context = context
+
+	camera_viewer.reset_viewer_states(None, None)
+	return context
+
+def mouse_events(context, count=256):
+	# A sweep across the region that passes over viewers, buttons and empty viewport.
+	region = context.region
+	return [
+		Struct(
+			type='MOUSEMOVE', value='NOTHING', shift=False, alt=False,
+			mouse_region_x=1 + (index * 37) % (region.width - 1), mouse_region_y=1 + (index * 53) % (region.height - 1),
+		)
+		for index in range(count)
+	]
+
+def bench_draw_static(context):
+	camera_viewer.draw_viewer_toggle(None)
+	return lambda: camera_viewer.draw_viewer_toggle(None)
+
+def bench_draw_dirty(context):
+	def run():
+		camera_viewer.tag_depsgraph_update(context.scene, None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_draw_contact_sheet(context):
+	context.screen.camera_viewer.contact_sheet = True
+	def run():
+		camera_viewer.tag_depsgraph_update(context.scene, None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_draw_profiled(context):
+	context.scene.camera_viewer_ui.use_profiler = True
+	def run():
+		camera_viewer.tag_depsgraph_update(context.scene, None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_draw_accumulate(context):
+	context.screen.camera_viewer.accumulate = True
+	context.screen.camera_viewer.accumulate_samples = 128
+	state = camera_viewer.get_viewer_state(context.screen.camera_viewer)
+	def run():
+		# Start over before the budget runs out so every call adds a sample.
+		if state.get("samples", 1) >= 127:
+			state.pop("history_key", None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_draw_scopes(context):
+	context.screen.camera_viewer.scope = 'WAVEFORM'
+	context.screen.camera_viewer.false_color = True
+	def run():
+		camera_viewer.tag_depsgraph_update(context.scene, None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_draw_stereo(context):
+	context.scene.render.use_multiview = True
+	context.screen.camera_viewer.stereo_mode = 'ANAGLYPH'
+	def run():
+		camera_viewer.tag_depsgraph_update(context.scene, None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_draw_guides(context):
+	camera_viewer_props = context.screen.camera_viewer
+	camera_viewer_props.guide_thirds = camera_viewer_props.guide_safe_areas = camera_viewer_props.letterbox = True
+	return lambda: camera_viewer.draw_viewer_toggle(None)
+
+def bench_draw_filtered(context):
+	context.screen.camera_viewer.filter_mode = 'EXCLUDE'
+	context.screen.camera_viewer.filter_layer = 'Layout Camera Viewer Filter'
+	layer = Struct(name='Layout Camera Viewer Filter', use=False)
+	layer.get = {camera_viewer.filter_layer_marker: True}.get
+	context.scene.view_layers = Collection([context.view_layer, layer])
+	def run():
+		camera_viewer.tag_depsgraph_update(context.scene, None)
+		camera_viewer.draw_viewer_toggle(None)
+	return run
+
+def bench_viewport_outline(context):
+	context.screen.camera_viewer.viewport_outline = True
+	return camera_viewer.draw_viewport_outline
+
+def bench_draw_prepare(context):
+	group = camera_viewer.Camera_Viewer_UI_Control()
+	group.setup(context)
+	return lambda: group.draw_prepare(context)
+
+def bench_test_select(context):
+	group = camera_viewer.Camera_Viewer_UI_Control()
+	group.setup(context)
+	group.draw_prepare(context)
+	shapes = [gizmos['Navigation'] for gizmos in group.viewer_gizmos]
+	locations = itertools.cycle([(event.mouse_region_x, event.mouse_region_y) for event in mouse_events(context)])
+	def run():
+		location = next(locations)
+		for shape in shapes:
+			shape.test_select(context, location)
+	return run
+
+def with_timer_ticks(events, every=4):
+	# A high polling rate mouse sends several moves per display frame.
+	tick = Struct(type='TIMER', value='NOTHING', shift=False, alt=False, mouse_region_x=0, mouse_region_y=0)
+	result = []
+	for index, event in enumerate(events):
+		result.append(event)
+		if index % every == every - 1:
+			result.append(tick)
+	return result
+
+def bench_modify_modal(context):
+	operator = camera_viewer.Modify_Camera_Viewer_OT()
+	operator.index = 0
+	events = mouse_events(context)
+	operator.invoke(context, events[0])
+	events = itertools.cycle(with_timer_ticks(events[1:]))
+	return lambda: operator.modal(context, next(events))
+
+def bench_navigation_modal(context):
+	operator = camera_viewer.Navigation_Camera_Viewer_OT()
+	operator.index = 0
+	events = mouse_events(context)
+	operator.invoke(context, events[0])
+	keys = [
+		Struct(type=type, value=value, shift=False, alt=False, mouse_region_x=0, mouse_region_y=0)
+		for type, value in (('W', 'PRESS'), ('D', 'PRESS'), ('WHEELUPMOUSE', 'PRESS'), ('W', 'RELEASE'), ('WHEELDOWNMOUSE', 'PRESS'), ('D', 'RELEASE'))
+	]
+	events = itertools.cycle(with_timer_ticks(events[1:65] + keys, every=2))
+	return lambda: operator.modal(context, next(events))
+
+def bench_point_in_area(context):
+	area = ((20, 20), (600, 20), (600, 340), (20, 340))
+	locations = itertools.cycle([(event.mouse_region_x, event.mouse_region_y) for event in mouse_events(context)])
+	return lambda: camera_viewer.point_in_area(next(locations), area)
+
+benchmarks = (
+	("draw_viewer_toggle (unchanged)", bench_draw_static),
+	("draw_viewer_toggle (scene changed)", bench_draw_dirty),
+	("draw_viewer_toggle (contact sheet)", bench_draw_contact_sheet),
+	("draw_viewer_toggle (profiler on)", bench_draw_profiled),
+	("draw_viewer_toggle (accumulating)", bench_draw_accumulate),
+	("draw_viewer_toggle (scopes)", bench_draw_scopes),
+	("draw_viewer_toggle (stereo)", bench_draw_stereo),
+	("draw_viewer_toggle (guides)", bench_draw_guides),
+	("draw_viewer_toggle (filtered)", bench_draw_filtered),
+	("draw_viewport_outline", bench_viewport_outline),
+	("draw_prepare", bench_draw_prepare),
+	("test_select", bench_test_select),
+	("modify modal", bench_modify_modal),
+	("navigation modal", bench_navigation_modal),
+	("point_in_area", bench_point_in_area),
+)
+
+def measure(function, number, repeat):
+	for i in range(min(number, 100)):
+		function()
+
+	rounds = []
+	for i in range(repeat):
+		start = time.perf_counter()
+		for j in range(number):
+			function()
+		rounds.append((time.perf_counter() - start) / number * 1e6)
+	rounds.sort()
+	return {"best_us": rounds[0], "median_us": rounds[len(rounds) // 2]}
+
+def run(number, repeat, viewers, cameras, select):
+	results = {}
+	for name, setup in benchmarks:
+		if select and select not in name:
+			continue
+		# Every benchmark starts from a fresh scene so state left by the previous one cannot leak in.
+		context = build_scene(viewers, cameras)
+		results[name] = measure(setup(context), number, repeat)
+		print(f'{name:<40} {results[name]["best_us"]:9.2f} us  (median {results[name]["median_us"]:.2f})')
+	return results
+
+def compare(results, baseline, threshold):
+	regressions = []
+	print()
+	print(f'{"benchmark":<40} {"baseline":>10} {"current":>10} {"change":>8}')
+	for name, values in results.items():
+		previous = baseline["results"].get(name)
+		if not previous:
+			print(f'{name:<40} {"-":>10} {values["best_us"]:10.2f}      new')
+			continue
+		change = values["best_us"] / previous["best_us"] - 1
+		flag = ''
+		if change > threshold:
+			flag = '  REGRESSION'
+			regressions.append(name)
+		print(f'{name:<40} {previous["best_us"]:10.2f} {values["best_us"]:10.2f} {change:+8.1%}{flag}')
+	return regressions
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the Camera Viewer add-on's Python overhead against stand-in Blender modules")
+	parser.add_argument("--number", type=int, default=2000, help="calls per round")
+	parser.add_argument("--repeat", type=int, default=5, help="rounds per benchmark, the best round is reported")
+	parser.add_argument("--viewers", type=int, default=2, help="viewers on the simulated screen")
+	parser.add_argument("--cameras", type=int, default=6, help="cameras in the simulated scene")
+	parser.add_argument("--select", default="", help="only run benchmarks whose name contains this text")
+	parser.add_argument("--save", metavar="FILE", help="write the results as a baseline file")
+	parser.add_argument("--compare", metavar="FILE", help="compare against a baseline file, exits with 1 on a regression")
+	parser.add_argument("--threshold", type=float, default=0.15, help="slowdown counted as a regression, 0.15 is 15%%")
+	args = parser.parse_args()
+
+	results = run(args.number, args.repeat, args.viewers, args.cameras, args.select)
+
+	if args.save:
+		with open(args.save, "w") as file:
+			json.dump({
+				"python": platform.python_version(),
+				"machine": platform.platform(),
+				"settings": {"number": args.number, "repeat": args.repeat, "viewers": args.viewers, "cameras": args.cameras},
+				"results": results,
+			}, file, indent=2)
+		print(f'\nBaseline saved to {args.save}')
+
+	if args.compare:
+		with open(args.compare) as file:
+			baseline = json.load(file)
+		if compare(results, baseline, args.threshold):
+			sys.exit(1)
+
+if __name__ == "__main__":
+	main()
@@ -1,12 +1,84 @@
 import bpy
 import gpu
 import blf
-from mathutils import Vector
+import os
+import time
+import math
+import zlib
+import queue
+import struct
+import threading
+import json
+import csv
+import numpy as np
+from contextlib import nullcontext
+from collections import namedtuple, deque
+from mathutils import Vector, Matrix
 from gpu_extras.batch import batch_for_shader
 from bpy.app.handlers import persistent
 
 dns = bpy.app.driver_namespace
 
+IS_BLENDER_5 = bpy.app.version >= (5, 0, 0)
+
+shader_cache = {}
+lut_cache = {}
+lut_size = 1024
+stats = {
+	"shader_compiles": 0,
+	"offscreen_allocations": 0,
+	"batch_rebuilds": 0,
+}
+
+batch_cache = {}
+batch_rebuild_times = deque(maxlen=1024)
+
+offscreen_pool = {"owners": {}, "spare": []}
+offscreen_serials = {}
+offscreen_pool_spare = 2
+offscreen_format_size = {'RGBA8': 4, 'RGBA16': 8, 'RGBA16F': 8, 'RGBA32F': 16}
+
+viewer_states = {}
+layout_cache = {}
+captures = {}
+profile_samples = {}
+profile_window = 240
+no_profile = nullcontext()
+space_cache = {}
+msgbus_owner = object()
+hit_indices = {}
+hit_cell_size = 64
+scope_samples = 128
+scope_levels = 64
+scope_budget = 0.05
+golden_ratio = (1 + math.sqrt(5)) / 2
+modal_interval = 1/60
+refine_interval = 0.01
+fly_keys = {'W', 'A', 'S', 'D', 'R', 'F', 'E', 'Q'}
+fly_acceleration = 8
+fly_damping = 12
+filter_layer_marker = "camera_viewer_filter"
+scene_updates = {"depsgraph": 0, "frame": 0, "selection": 0, "filter": 0, "collections": 0}
+
+shading_keys = (
+	'type', 'light', 'studio_light', 'color_type', 'single_color', 'background_type', 'background_color',
+	'wireframe_color_type', 'show_xray', 'xray_alpha', 'show_shadows', 'shadow_intensity', 'show_cavity',
+	'use_dof', 'show_object_outline', 'object_outline_color', 'show_specular_highlight',
+	'use_scene_lights', 'use_scene_world', 'use_scene_lights_render', 'use_scene_world_render',
+	'studiolight_rotate_z', 'studiolight_intensity', 'studiolight_background_alpha', 'render_pass', 'use_compositor',
+)
+
+view_keys = ('view_transform', 'look', 'exposure', 'gamma', 'use_curve_mapping')
+
+stereo_keys = ('convergence_mode', 'convergence_distance', 'interocular_distance', 'pivot')
+
+upscale_filters = ('LINEAR', 'BICUBIC', 'SHARPEN')
+
+overlay_keys = (
+	'show_overlays', 'show_extras', 'show_bones', 'show_wireframes', 'wireframe_threshold', 'show_look_dev',
+	'show_floor', 'show_axis_x', 'show_axis_y', 'show_axis_z', 'show_relationship_lines', 'show_outline_selected',
+)
+
 def point_in_area(point, area):
 	x, y = point
 	n = len(area)
@@ -26,26 +98,247 @@ def point_in_area(point, area):
 
 	return inside
 
-def get_offscreen(context):
-	camera_viewer = context.screen.camera_viewer
+def get_offscreen(context, camera_viewer, tag=None):
 	scene = context.scene
 	render = scene.render
 	scale = (render.resolution_y/1080)
-	width = int(render.resolution_x/scale * camera_viewer.size*camera_viewer.quality/100)
-	height = int(render.resolution_y/scale * camera_viewer.size*camera_viewer.quality/100)			
-	offscreen = gpu.types.GPUOffScreen(width, height, format='RGBA16F')
+	quality = get_effective_quality(camera_viewer)
+	width = int(render.resolution_x/scale * camera_viewer.size*quality/100)
+	height = int(render.resolution_y/scale * camera_viewer.size*quality/100)
+	return acquire_offscreen(camera_viewer.as_pointer() if tag is None else (camera_viewer.as_pointer(), tag), width, height)
+
+def acquire_offscreen(owner, width, height, format='RGBA16F'):
+	key = (max(width, 1), max(height, 1), format)
+	owners = offscreen_pool["owners"]
+	spare = offscreen_pool["spare"]
+
+	current = owners.get(owner)
+	if current and current[0] == key:
+		return current[1]
+
+	if current:
+		spare.append(current)
+
+	for i, (spare_key, spare_offscreen) in enumerate(spare):
+		if spare_key == key:
+			offscreen = spare.pop(i)[1]
+			break
+	else:
+		offscreen = gpu.types.GPUOffScreen(key[0], key[1], format=format)
+		stats["offscreen_allocations"] += 1
+		# A freed buffer's id can come back with the next allocation, the serial never does.
+		offscreen_serials[id(offscreen)] = stats["offscreen_allocations"]
+
+	# Keep a couple of recently released buffers around so scrolling quality back and forth reuses them.
+	while len(spare) > offscreen_pool_spare:
+		free_offscreen(spare.pop(0)[1])
+
+	owners[owner] = (key, offscreen)
 	return offscreen
 
+def get_offscreen_serial(offscreen):
+	return offscreen_serials.get(id(offscreen))
+
+def free_offscreen(offscreen):
+	offscreen_serials.pop(id(offscreen), None)
+	offscreen.free()
+
+def release_offscreen(owner):
+	current = offscreen_pool["owners"].pop(owner, None)
+	if current:
+		free_offscreen(current[1])
+
+def release_viewer_offscreens(pointer):
+	# A viewer owns its main buffer under its pointer and any extra buffers under (pointer, name).
+	# A running capture still reads its staging buffers, it frees them itself when it finishes.
+	capturing = pointer in captures
+	for owner in [owner for owner in offscreen_pool["owners"] if get_owner_pointer(owner) == pointer]:
+		if capturing and isinstance(owner, tuple) and owner[1] == 'capture':
+			continue
+		release_offscreen(owner)
+
+	# Whatever the state remembers about the freed buffers no longer holds.
+	state = viewer_states.get(pointer)
+	if state:
+		for key in ("render_key", "offscreen", "atlas", "tile_keys", "history_key", "samples", "scope_source"):
+			state.pop(key, None)
+
+def get_owner_pointer(owner):
+	return owner[0] if isinstance(owner, tuple) else owner
+
+def free_offscreens():
+	for key, offscreen in offscreen_pool["owners"].values():
+		offscreen.free()
+	for key, offscreen in offscreen_pool["spare"]:
+		offscreen.free()
+	offscreen_pool["owners"].clear()
+	offscreen_pool["spare"].clear()
+	offscreen_serials.clear()
+
+def offscreen_memory():
+	# Colour attachment plus the 32 bit depth buffer of every pooled offscreen, in bytes.
+	total = 0
+	for (width, height, format), offscreen in (*offscreen_pool["owners"].values(), *offscreen_pool["spare"]):
+		total += width * height * (offscreen_format_size.get(format, 8) + 4)
+	return total
+
+class Profile_Section:
+	__slots__ = ("name", "sync", "start", "target")
+
+	def __init__(self, name, sync, target):
+		self.name = name
+		self.sync = sync
+		self.target = target
+
+	def __enter__(self):
+		if self.sync:
+			gpu_sync(self.target)
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *args):
+		# With GPU timing the barrier makes the section include the work it queued on the GPU. Sections that
+		# only know their buffer once they ran set target inside the block.
+		if self.sync:
+			gpu_sync(self.target)
+		samples = profile_samples.get(self.name)
+		if samples is None:
+			samples = profile_samples[self.name] = deque(maxlen=profile_window)
+		samples.append((time.perf_counter() - self.start) * 1000)
+
+def profile(context, name, target=None):
+	camera_viewer_ui = context.scene.camera_viewer_ui
+	if not camera_viewer_ui.use_profiler:
+		return no_profile
+	return Profile_Section(name, camera_viewer_ui.profile_gpu, target)
+
+def gpu_sync(target=None):
+	# The gpu module has no fence or finish. Reading a pixel back from the framebuffer a section drew into waits
+	# for the work queued on it, the region's own framebuffer when the section draws straight into the viewport.
+	if target is None:
+		gpu.state.active_framebuffer_get().read_color(0, 0, 1, 1, 4, 0, 'FLOAT')
+		return
+	with target.bind():
+		gpu.state.active_framebuffer_get().read_color(0, 0, 1, 1, 4, 0, 'FLOAT')
+
+def get_profile_summary():
+	summary = {}
+	for name, samples in profile_samples.items():
+		if samples:
+			ordered = sorted(samples)
+			summary[name] = {
+				"count": len(ordered),
+				"p50": ordered[len(ordered) // 2],
+				"p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+				"max": ordered[-1],
+				"mean": sum(ordered) / len(ordered),
+			}
+	return summary
+
+def draw_profile_hud(x, y):
+	font_id = 0
+	lines = [f'{name:<16} p50 {values["p50"]:6.2f}  p95 {values["p95"]:6.2f}  max {values["max"]:6.2f} ms' for name, values in get_profile_summary().items()]
+	lines.append(f'GPU memory {offscreen_memory()/1048576:.1f} MB | batch rebuilds {batch_rebuild_rate()}/s | shader compiles {stats["shader_compiles"]}')
+
+	blf.enable(font_id, blf.SHADOW)
+	blf.color(font_id, 1, 1, 1, 0.8)
+	blf.size(font_id, 11)
+	for i, line in enumerate(reversed(lines)):
+		blf.position(font_id, x, y + i * 14, 0)
+		blf.draw(font_id, line)
+	blf.disable(font_id, blf.SHADOW)
+
+def get_batch(name, shader, type, content, indices=None):
+	# Batches stay on the GPU until their geometry changes, callers only update uniforms.
+	key = (type, content, indices)
+	cached = batch_cache.get(name)
+	if cached and cached[0] == key:
+		return cached[1]
+
+	if len(batch_cache) > 512:
+		batch_cache.clear()
+
+	batch = batch_for_shader(shader, type, content, indices=indices)
+	batch_cache[name] = (key, batch)
+
+	stats["batch_rebuilds"] += 1
+	batch_rebuild_times.append(time.perf_counter())
+	return batch
+
+def batch_rebuild_rate():
+	# Batch rebuilds during the last second.
+	now = time.perf_counter()
+	return sum(1 for stamp in batch_rebuild_times if now - stamp <= 1)
+
 def get_shader():
+	shader = shader_cache.get("viewer")
+	if shader is None:
+		shader = shader_cache["viewer"] = create_viewer_shader()
+		stats["shader_compiles"] += 1
+	return shader
+
+def free_shaders():
+	shader_cache.clear()
+	lut_cache.clear()
+
+def srgb_decode(values):
+	return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+def srgb_encode(values):
+	return np.where(values <= 0.0031308, values * 12.92, 1.055 * np.maximum(values, 0.0031308) ** (1 / 2.4) - 0.055)
+
+def get_color_mode(context, camera_viewer):
+	# The table only reproduces the Standard view transform, any other transform, look or curve falls back to the
+	# scene's colour management so Fast never shows different colours than the render.
+	view_settings = context.scene.view_settings
+	if camera_viewer.color_mode == 'FAST' and view_settings.view_transform == 'Standard' and view_settings.look == 'None' and not view_settings.use_curve_mapping:
+		return 'FAST'
+	return 'SCENE'
+
+def get_color_table(context, camera_viewer):
+	# The viewer draws into the sRGB encoded region buffer, so the table hands over linear values.
+	# Scene mode gets the display referred result of the scene's colour management and only undoes the sRGB curve,
+	# Fast mode renders unmanaged and applies exposure, gamma and the Standard view transform from the table.
+	view_settings = context.scene.view_settings
+	coords = np.linspace(0.0, 1.0, lut_size)
+	if get_color_mode(context, camera_viewer) == 'SCENE':
+		return ('SCENE',), srgb_decode(coords), 1.0
+
+	# Entry t stands for the scene value t / 2^exposure, everything above clips like the Standard view.
+	values = srgb_decode(srgb_encode(coords) ** (1 / max(view_settings.gamma, 0.001)))
+	return ('FAST', view_settings.exposure, view_settings.gamma), values, 2 ** -view_settings.exposure
+
+def get_color_lut(context, camera_viewer):
+	view_settings = context.scene.view_settings
+	key = ('SCENE',) if get_color_mode(context, camera_viewer) == 'SCENE' else ('FAST', view_settings.exposure, view_settings.gamma)
+	cached = lut_cache.get(key)
+	if cached:
+		return cached
+
+	key, values, lut_range = get_color_table(context, camera_viewer)
+	if len(lut_cache) > 8:
+		lut_cache.clear()
+
+	texture = gpu.types.GPUTexture(lut_size, format='R16F', data=gpu.types.Buffer('FLOAT', lut_size, values.astype(np.float32).tolist()))
+	lut_cache[key] = (texture, lut_range)
+	return lut_cache[key]
+
+def create_viewer_shader():
 	vert_out = gpu.types.GPUStageInterfaceInfo("my_interface")
 	vert_out.smooth('VEC2', "uv")
 
 	shader_info = gpu.types.GPUShaderCreateInfo()
 
 	shader_info.sampler(0, 'FLOAT_2D', "image")
+	shader_info.sampler(1, 'FLOAT_1D', "lut")
 	shader_info.vertex_in(0, 'VEC2', "pos")
 	shader_info.vertex_in(1, 'VEC2', "texCoord")
-	shader_info.push_constant('BOOL', "grayscale")
+	shader_info.push_constant('BOOL', "value_check")
+	shader_info.push_constant('BOOL', "false_color")
+	shader_info.push_constant('FLOAT', "lut_range")
+	shader_info.push_constant('INT', "upscale")
+	shader_info.push_constant('FLOAT', "sharpness")
+	shader_info.push_constant('BOOL', "anaglyph")
 	shader_info.vertex_out(vert_out)
 
 	shader_info.push_constant('MAT4', "ModelViewProjectionMatrix")
@@ -60,17 +353,76 @@ def get_shader():
 		"}"
 	)
 
+	# The offscreen is smaller than the viewer, upscale it with a Catmull-Rom filter (nine bilinear taps)
+	# or a contrast adaptive sharpen that holds back on edges that already have contrast.
+	# In anaglyph mode the image holds both eyes side by side, red comes from the left and cyan from the right.
 	shader_info.fragment_source(
+		"vec4 sample_bicubic(vec2 coord)"
+		"{"
+		"  vec2 size = vec2(textureSize(image, 0));"
+		"  vec2 center = floor(coord * size - 0.5) + 0.5;"
+		"  vec2 f = coord * size - center;"
+		"  vec2 w0 = f * (-0.5 + f * (1.0 - 0.5 * f));"
+		"  vec2 w1 = 1.0 + f * f * (-2.5 + 1.5 * f);"
+		"  vec2 w2 = f * (0.5 + f * (2.0 - 1.5 * f));"
+		"  vec2 w3 = f * f * (-0.5 + 0.5 * f);"
+		"  vec2 w12 = w1 + w2;"
+		"  vec2 t0 = (center - 1.0) / size;"
+		"  vec2 t12 = (center + w2 / w12) / size;"
+		"  vec2 t3 = (center + 2.0) / size;"
+		"  vec4 color = (texture(image, vec2(t0.x, t0.y)) * w0.x + texture(image, vec2(t12.x, t0.y)) * w12.x + texture(image, vec2(t3.x, t0.y)) * w3.x) * w0.y;"
+		"  color += (texture(image, vec2(t0.x, t12.y)) * w0.x + texture(image, vec2(t12.x, t12.y)) * w12.x + texture(image, vec2(t3.x, t12.y)) * w3.x) * w12.y;"
+		"  color += (texture(image, vec2(t0.x, t3.y)) * w0.x + texture(image, vec2(t12.x, t3.y)) * w12.x + texture(image, vec2(t3.x, t3.y)) * w3.x) * w3.y;"
+		"  return max(color, vec4(0.0));"
+		"}"
+		"vec4 sample_sharpen(vec2 coord)"
+		"{"
+		"  vec2 texel = 1.0 / vec2(textureSize(image, 0));"
+		"  vec4 e = texture(image, coord);"
+		"  vec3 b = texture(image, coord + vec2(0.0, texel.y)).rgb;"
+		"  vec3 d = texture(image, coord - vec2(texel.x, 0.0)).rgb;"
+		"  vec3 f = texture(image, coord + vec2(texel.x, 0.0)).rgb;"
+		"  vec3 h = texture(image, coord - vec2(0.0, texel.y)).rgb;"
+		"  vec3 lo = min(min(min(b, d), min(f, h)), e.rgb);"
+		"  vec3 hi = max(max(max(b, d), max(f, h)), e.rgb);"
+		"  vec3 amount = sqrt(clamp(min(lo, 2.0 - hi) / max(hi, vec3(0.0001)), 0.0, 1.0));"
+		"  vec3 w = -amount / mix(8.0, 5.0, sharpness);"
+		"  return vec4(max(((b + d + f + h) * w + e.rgb) / (1.0 + 4.0 * w), vec3(0.0)), e.a);"
+		"}"
+		"vec4 sample_image(vec2 coord)"
+		"{"
+		"  if (upscale == 1) return sample_bicubic(coord);"
+		"  if (upscale == 2) return sample_sharpen(coord);"
+		"  return texture(image, coord);"
+		"}"
 		"void main()"
 		"{"
-		"  vec4 finalColor = mix(vec4(0.0), texture(image, uv), 1.0);"
-		"  finalColor.rgb = pow(finalColor.rgb, vec3(2.2));"
-		"  if (grayscale) {"
-		"    float luminance = dot(finalColor.rgb, vec3(0.299, 0.587, 0.114));"
-		"    fragColor = vec4(vec3(luminance), finalColor.a);"
+		"  vec4 finalColor;"
+		"  if (anaglyph) {"
+		"    vec2 left = vec2(uv.x * 0.5, uv.y);"
+		"    vec4 right = sample_image(left + vec2(0.5, 0.0));"
+		"    finalColor = sample_image(left);"
+		"    finalColor.gb = right.gb;"
 		"  } else {"
-		"    fragColor = finalColor;"
+		"    finalColor = sample_image(uv);"
+		"  }"
+		"  float size = float(textureSize(lut, 0));"
+		"  vec3 coord = (clamp(finalColor.rgb / lut_range, 0.0, 1.0) * (size - 1.0) + 0.5) / size;"
+		"  finalColor.rgb = vec3(texture(lut, coord.r).r, texture(lut, coord.g).r, texture(lut, coord.b).r);"
+		"  float luma = dot(finalColor.rgb, vec3(0.2126, 0.7152, 0.0722));"
+		"  if (false_color) {"
+		"    float stops = log2(max(luma, 0.00001) / 0.18);"
+		"    if (luma >= 0.99) finalColor.rgb = vec3(1.0, 0.0, 0.0);"
+		"    else if (stops < -6.0) finalColor.rgb = vec3(0.25, 0.0, 0.45);"
+		"    else if (stops < -3.0) finalColor.rgb = vec3(0.0, 0.25, 0.9);"
+		"    else if (stops < -0.5) finalColor.rgb = vec3(luma);"
+		"    else if (stops < 0.5) finalColor.rgb = vec3(0.1, 0.8, 0.2);"
+		"    else if (stops < 2.0) finalColor.rgb = vec3(luma);"
+		"    else finalColor.rgb = vec3(1.0, 0.55, 0.0);"
+		"  } else if (value_check) {"
+		"    finalColor.rgb = vec3(luma);"
 		"  }"
+		"  fragColor = finalColor;"
 		"}"
 	)
 
@@ -78,62 +430,660 @@ def get_shader():
 	shader = gpu.shader.create_from_info(shader_info)
 	return shader
 
+Viewer_Layout = namedtuple("Viewer_Layout", ("x", "y", "width", "height", "buttons"))
+
+def compute_viewer_layout(region_width, region_height, n_panel, tool_panel, x, y, size, position, resolution_x, resolution_y, use_lighting):
+	scale = resolution_y/1080
+	width = int(resolution_x/scale * size/3.5)
+	height = int(resolution_y/scale * size/3.5)
+
+	if position == 'Left-Bottom':
+		x = x+20
+		y = y+20
+	elif position == 'Right-Bottom':
+		x = (x+40)*-1 + region_width-width
+		y = y+20
+	elif position == 'Left-Top':
+		x = x+20 + tool_panel
+		y = (y+180)*-1 + region_height-height
+	elif position == 'Right-Top':
+		x = (x+20)*-1 + region_width-n_panel-width
+		y = (y+60)*-1 + region_height-height
+
+	# Space buttons sit in a row above the viewer, counted in button widths from the outer corner.
+	scale = 14
+	if 'Left' in position:
+		columns = {
+			'lock_viewer': 0, 'RENDERED': 1, 'MATERIAL': 2, 'SOLID': 3, 'OVERLAY': 4,
+			'scene_world': 5, 'scene_world_render': 5, 'scene_lights': 6, 'scene_lights_render': 6,
+			'ALWAYS': 7 if use_lighting else 5,
+			'CAMERA': 8 if use_lighting else 6,
+			'DISABLED': 9 if use_lighting else 7,
+		}
+		buttons = {type: (x + width - scale - (scale*2)*column, y + height + scale + 3) for type, column in columns.items()}
+		buttons['Modify'] = (x + width, y + height)
+	else:
+		columns = {
+			'lock_viewer': 0, 'OVERLAY': 1, 'SOLID': 2, 'MATERIAL': 3, 'RENDERED': 4,
+			'scene_lights': 5, 'scene_lights_render': 5, 'scene_world': 6, 'scene_world_render': 6,
+			'DISABLED': 7 if use_lighting else 5,
+			'CAMERA': 8 if use_lighting else 6,
+			'ALWAYS': 9 if use_lighting else 7,
+		}
+		buttons = {type: (x + scale + (scale*2)*column, y + height + scale + 3) for type, column in columns.items()}
+		buttons['Modify'] = (x + 12, y + height)
+
+	buttons['Navigation'] = (x + width/2, y + height/2)
+
+	return Viewer_Layout(x, y, width, height, buttons)
+
+def get_region_panels(area):
+	n_panel = 0
+	tool_panel = 0
+	for r in area.regions:
+		if r.type == 'UI':
+			n_panel = r.width
+		elif r.type == 'TOOLS':
+			tool_panel = r.width
+	return n_panel, tool_panel
+
+def get_viewer_layout(context, camera_viewer):
+	region = context.region
+	render = context.scene.render
+	n_panel, tool_panel = get_region_panels(context.area)
+
+	key = (
+		region.width, region.height, n_panel, tool_panel,
+		camera_viewer.x, camera_viewer.y, camera_viewer.size, camera_viewer.position,
+		render.resolution_x, render.resolution_y, context.scene.camera_viewer_ui.use_lighting,
+	)
+	owner = (region.as_pointer(), camera_viewer.as_pointer())
+
+	cached = layout_cache.get(owner)
+	if cached and cached[0] == key:
+		return cached[1]
+
+	if len(layout_cache) > 256:
+		layout_cache.clear()
+
+	layout = compute_viewer_layout(*key)
+	layout_cache[owner] = (key, layout)
+	return layout
+
+def build_hit_index(entries):
+	# Uniform grid over the region, every cell lists the rectangles touching it.
+	cells = {}
+	for entry in entries:
+		(x0, y0, x1, y1), part = entry
+		for cx in range(int(x0 // hit_cell_size), int(x1 // hit_cell_size) + 1):
+			for cy in range(int(y0 // hit_cell_size), int(y1 // hit_cell_size) + 1):
+				cells.setdefault((cx, cy), []).append(entry)
+	return cells
+
+def update_hit_index(region, entries):
+	entries = tuple(entries)
+	cached = hit_indices.get(region.as_pointer())
+	if cached and cached[0] == entries:
+		return
+
+	if len(hit_indices) > 64:
+		hit_indices.clear()
+
+	hit_indices[region.as_pointer()] = (entries, build_hit_index(entries), {})
+
+def hit_test(region, location):
+	# Returns (viewer index, part) under the location, the last added entry wins like the draw order.
+	cached = hit_indices.get(region.as_pointer())
+	if not cached:
+		return None
+
+	x, y = location
+	lookups = cached[2]
+	if (x, y) in lookups:
+		return lookups[x, y]
+
+	part = None
+	for (x0, y0, x1, y1), entry_part in cached[1].get((int(x // hit_cell_size), int(y // hit_cell_size)), ()):
+		if x0 <= x <= x1 and y0 <= y <= y1:
+			part = entry_part
+
+	if len(lookups) > 64:
+		lookups.clear()
+	lookups[x, y] = part
+	return part
+
+def get_viewers(screen):
+	return (screen.camera_viewer, *screen.camera_viewers)
+
+def get_viewer(screen, index):
+	if 0 < index <= len(screen.camera_viewers):
+		return screen.camera_viewers[index - 1]
+	return screen.camera_viewer
+
+def get_viewer_screen_name(screen, camera_viewer):
+	if camera_viewer.space_screen:
+		return camera_viewer.space_screen
+	# Only the main viewer has a hidden screen by convention, the others store the name they got when first shown.
+	if camera_viewer == screen.camera_viewer:
+		return screen.name + ' Camera Viewer'
+	return ''
+
+def new_viewer_screen_name(screen, camera_viewer):
+	# The first name no other viewer claims, a hidden screen left behind by a removed viewer is picked up again.
+	claimed = {
+		get_viewer_screen_name(owner, other) for owner in (screen, *bpy.data.screens)
+		for other in get_viewers(owner) if other != camera_viewer
+	}
+	name = screen.name + ' Camera Viewer'
+	index = 1
+	while name in claimed:
+		index += 1
+		name = screen.name + f' Camera Viewer {index}'
+	return name
+
+def get_viewer_space(screen, camera_viewer):
+	# The space is cached per viewer and only trusted while its screen still lives at the same address. A freed
+	# screen raises ReferenceError, only then or on a miss is the screen looked up by name.
+	owner = camera_viewer.as_pointer()
+	cached = space_cache.get(owner)
+	if cached:
+		try:
+			if cached[1].as_pointer() == cached[0]:
+				return cached[2]
+		except ReferenceError:
+			pass
+
+	viewer_screen = bpy.data.screens.get(get_viewer_screen_name(screen, camera_viewer))
+	space = None
+	if viewer_screen:
+		for a in viewer_screen.areas:
+			if a.type == 'VIEW_3D':
+				space = a.spaces[0]
+				break
+
+	if space:
+		space_cache[owner] = (viewer_screen.as_pointer(), viewer_screen, space)
+	else:
+		space_cache.pop(owner, None)
+	return space
+
+def store_viewer_screen_names():
+	# Files from before the name was stored only know the hidden screen by the "<screen> Camera Viewer" convention.
+	for screen in bpy.data.screens:
+		camera_viewer = screen.camera_viewer
+		if not camera_viewer.space_screen and bpy.data.screens.get(screen.name + ' Camera Viewer'):
+			camera_viewer.space_screen = screen.name + ' Camera Viewer'
+
+def update_viewer_screen_names():
+	# Follow renamed hidden screens through the cached pointers so the viewer keeps its space.
+	screens = {screen.as_pointer(): screen for screen in bpy.data.screens}
+	for screen in screens.values():
+		for camera_viewer in get_viewers(screen):
+			cached = space_cache.get(camera_viewer.as_pointer())
+			if cached and cached[0] in screens:
+				name = screens[cached[0]].name
+				if camera_viewer.space_screen != name:
+					camera_viewer.space_screen = name
+			elif not bpy.data.screens.get(camera_viewer.space_screen):
+				space_cache.pop(camera_viewer.as_pointer(), None)
+
+def tag_active_object():
+	scene_updates["selection"] += 1
+
+def subscribe_viewer_messages():
+	bpy.msgbus.clear_by_owner(msgbus_owner)
+	bpy.msgbus.subscribe_rna(
+		key=(bpy.types.Screen, "name"),
+		owner=msgbus_owner,
+		args=(),
+		notify=update_viewer_screen_names,
+	)
+	bpy.msgbus.subscribe_rna(
+		key=(bpy.types.LayerObjects, "active"),
+		owner=msgbus_owner,
+		args=(),
+		notify=tag_active_object,
+	)
+
+def migrate_viewer_cameras():
+	# Files from before the camera pointer only know the locked camera by name.
+	for screen in bpy.data.screens:
+		for camera_viewer in get_viewers(screen):
+			if camera_viewer.camera and not camera_viewer.camera_object:
+				camera = bpy.data.objects.get(camera_viewer.camera)
+				if camera and camera.type == 'CAMERA':
+					camera_viewer.camera_object = camera
+					camera_viewer.camera = ''
+
+def get_viewer_camera(context, camera_viewer):
+	# Resolved once per viewer and reused until the depsgraph, the frame, the active object or the viewer's own settings change.
+	state = get_viewer_state(camera_viewer)
+	key = (
+		scene_updates["depsgraph"], scene_updates["frame"], scene_updates["selection"],
+		context.scene.as_pointer(), camera_viewer.active_camera, camera_viewer.lock_camera,
+	)
+	cached = state.get("camera")
+	if cached and cached[0] == key:
+		return cached[1]
+
+	if camera_viewer.active_camera:
+		active_object = context.active_object
+		camera = active_object if active_object and active_object.type == 'CAMERA' else None
+	elif camera_viewer.lock_camera and camera_viewer.camera_object:
+		camera = camera_viewer.camera_object
+	else:
+		camera = context.scene.camera
+
+	state["camera"] = (key, camera)
+	return camera
+
+def get_viewer_layer(context, camera_viewer):
+	# A filtered viewer renders its own view layer, synced from a timer because collections cannot be
+	# excluded while the viewport draws. Only filter and collection changes can make it stale.
+	if camera_viewer.filter_mode == 'NONE':
+		return context.view_layer
+
+	state = get_viewer_state(camera_viewer)
+	key = (scene_updates["collections"], scene_updates["filter"], context.scene.as_pointer(), context.view_layer.as_pointer())
+	cached = state.get("filter_layer")
+	if cached and cached[0] == key:
+		return cached[1]
+
+	if not bpy.app.timers.is_registered(sync_filter_layers):
+		bpy.app.timers.register(sync_filter_layers, first_interval=0)
+
+	layer = get_filter_layer(context.scene, camera_viewer)
+	state["filter_layer"] = (key, layer)
+	return layer or context.view_layer
+
+def get_filter_layer(scene, camera_viewer):
+	# Layers the add-on made carry a marker, a user layer that happens to share the name is never touched.
+	layer = scene.view_layers.get(camera_viewer.filter_layer) if camera_viewer.filter_layer else None
+	if layer and layer.get(filter_layer_marker):
+		return layer
+	return None
+
+def new_filter_layer_name(screen, camera_viewer):
+	taken = {layer.name for scene in bpy.data.scenes for layer in scene.view_layers}
+	taken.update(other.filter_layer for owner in bpy.data.screens for other in get_viewers(owner))
+	name = get_viewer_screen_name(screen, camera_viewer) or screen.name + ' Camera Viewer'
+	index = 1
+	while f"{name} Filter" + (f" {index}" if index > 1 else "") in taken:
+		index += 1
+	return f"{name} Filter" + (f" {index}" if index > 1 else "")
+
+def walk_layer_collections(layer_collection):
+	for child in layer_collection.children:
+		yield child
+		yield from walk_layer_collections(child)
+
+def sync_layer_collections(active, target, mode, collections, wanted, inside):
+	# Mirrors the active layer and then applies the filter, returns whether anything below is kept.
+	found = False
+	for active_child, child in zip(active.children, target.children):
+		listed = child.name in collections
+		held = sync_layer_collections(active_child, child, mode, collections, wanted, inside or (listed and mode == 'INCLUDE'))
+		if mode == 'EXCLUDE':
+			keep = not listed
+		else:
+			# Parents of kept collections stay in so the children can render, their own objects get hidden.
+			keep = inside or listed or held or child.name in wanted
+		exclude = active_child.exclude or not keep
+		if child.exclude != exclude:
+			child.exclude = exclude
+		if child.hide_viewport != active_child.hide_viewport:
+			child.hide_viewport = active_child.hide_viewport
+		found = found or keep
+	return found
+
+def sync_viewer_layer(scene, active, screen, camera_viewer):
+	# Returns whether the layer was created or rewritten.
+	collections = {item.collection.name for item in camera_viewer.filters if item.collection}
+	objects = {item.object.name for item in camera_viewer.filters if item.object}
+
+	layer = get_filter_layer(scene, camera_viewer)
+	if layer is None and (not camera_viewer.filter_layer or scene.view_layers.get(camera_viewer.filter_layer)):
+		# No name yet, or a user layer took it, drop what the old name left behind and pick a free one.
+		remove_filter_layers(camera_viewer)
+		camera_viewer.filter_layer = new_filter_layer_name(screen, camera_viewer)
+
+	# Kept per scene so windows showing different scenes don't take turns rewriting their layers.
+	keys = get_viewer_state(camera_viewer).setdefault("filter_keys", {})
+	key = (
+		active.as_pointer(), camera_viewer.filter_layer, camera_viewer.filter_mode, tuple(sorted(collections)), tuple(sorted(objects)),
+		tuple((layer_collection.exclude, layer_collection.hide_viewport) for layer_collection in walk_layer_collections(active.layer_collection)),
+		len(bpy.data.objects), len(bpy.data.collections),
+	)
+	if layer and keys.get(scene.as_pointer()) == key:
+		return False
+
+	if layer is None:
+		layer = scene.view_layers.new(camera_viewer.filter_layer)
+		layer[filter_layer_marker] = True
+	if layer.use:
+		layer.use = False
+
+	mode = camera_viewer.filter_mode
+	wanted = {collection.name for name in objects for collection in bpy.data.objects[name].users_collection}
+	sync_layer_collections(active.layer_collection, layer.layer_collection, mode, collections, wanted, False)
+
+	# Objects are hidden in the viewer layer only, the other view layers keep their own visibility.
+	if mode == 'INCLUDE':
+		included = set(collections)
+		for collection_name in collections:
+			included.update(child.name for child in bpy.data.collections[collection_name].children_recursive)
+	for ob in layer.objects:
+		if mode == 'EXCLUDE':
+			hide = ob.name in objects
+		else:
+			hide = ob.name not in objects and not any(collection.name in included for collection in ob.users_collection)
+		if ob.hide_get(view_layer=layer) != hide:
+			ob.hide_set(hide, view_layer=layer)
+
+	# The layer has a depsgraph of its own, evaluate it now rather than waiting for an unrelated update.
+	layer.depsgraph.update()
+
+	keys[scene.as_pointer()] = key
+	return True
+
+def sync_filter_layers():
+	# Only a rewritten layer needs a redraw, otherwise the draw that scheduled this sync already used the current one.
+	changed = False
+	for window in bpy.context.window_manager.windows:
+		for camera_viewer in get_viewers(window.screen):
+			if camera_viewer.filter_mode != 'NONE' and sync_viewer_layer(window.scene, window.view_layer, window.screen, camera_viewer):
+				get_viewer_state(camera_viewer).pop("filter_layer", None)
+				changed = True
+	if changed:
+		tag_viewer_redraw()
+
+def remove_filter_layers(camera_viewer):
+	# The layer is saved with the file, take it out of every scene it was made in.
+	if camera_viewer.filter_layer:
+		for scene in bpy.data.scenes:
+			layer = get_filter_layer(scene, camera_viewer)
+			if layer and len(scene.view_layers) > 1:
+				scene.view_layers.remove(layer)
+		camera_viewer.filter_layer = ''
+	state = get_viewer_state(camera_viewer)
+	state.pop("filter_layer", None)
+	state.pop("filter_keys", None)
+
+def ensure_viewer_screen(context, camera_viewer):
+	# Returns a warning for the calling operator when the hidden screen cannot be made.
+	screen = context.screen
+	name = get_viewer_screen_name(screen, camera_viewer)
+
+	if not bpy.data.screens.get(name):
+		name = new_viewer_screen_name(screen, camera_viewer)
+
+	created = False
+	if not bpy.data.screens.get(name):
+		# Create a new screen to hold the viewer's own shading and overlay settings
+		screens = set(bpy.data.screens.keys())
+		bpy.ops.screen.new()
+		new_screens = [s for s in bpy.data.screens if s.name not in screens]
+
+		context.window.screen = screen
+
+		if not new_screens:
+			return f"View3D not found, cannot create the viewer screen for {screen.name}"
+
+		new_screens[0].name = name
+		created = True
+		space_cache.pop(camera_viewer.as_pointer(), None)
+
+	camera_viewer.space_screen = name
+
+	if created:
+		space = get_viewer_space(screen, camera_viewer)
+		if space:
+			space.overlay.show_look_dev = False
+
+	return None
+
+def sync_draw_handler():
+	# All viewers of every screen share a single draw handler.
+	enabled = any(camera_viewer.viewer_toggle for screen in bpy.data.screens for camera_viewer in get_viewers(screen))
+
+	if enabled and not dns.get("draw_viewer_toggle"):
+		dns["draw_viewer_toggle"] = bpy.types.SpaceView3D.draw_handler_add(draw_viewer_toggle, (None,), 'WINDOW', 'POST_PIXEL')
+	elif not enabled and dns.get("draw_viewer_toggle"):
+		bpy.types.SpaceView3D.draw_handler_remove(dns.pop("draw_viewer_toggle"), 'WINDOW')
+
+def release_stale_viewers():
+	# Collection edits move viewer properties in memory, drop whatever belonged to the old addresses.
+	live = {camera_viewer.as_pointer() for screen in bpy.data.screens for camera_viewer in get_viewers(screen)}
+
+	for owner in [owner for owner in offscreen_pool["owners"] if get_owner_pointer(owner) not in live]:
+		release_offscreen(owner)
+
+	for owner in [owner for owner in viewer_states if owner not in live]:
+		cancel_viewer_redraw(viewer_states.pop(owner))
+
+def get_viewer_index(screen):
+	return min(screen.get("camera_viewer_index", 0), len(screen.camera_viewers))
+
+def set_viewer_index(screen, value):
+	screen["camera_viewer_index"] = min(max(value, 0), len(screen.camera_viewers))
+
+def get_viewer_state(camera_viewer):
+	return viewer_states.setdefault(camera_viewer.as_pointer(), {})
+
+def get_effective_quality(camera_viewer):
+	if camera_viewer.adaptive_quality:
+		return get_viewer_state(camera_viewer).get("quality", camera_viewer.quality)
+	return camera_viewer.quality
+
+def update_quality_governor(camera_viewer, state, render_time):
+	# Smooth the measured time and only step when it leaves the band around the target, then hold for a few renders.
+	average = state.get("render_time", render_time)
+	average += (render_time - average) * 0.25
+	state["render_time"] = average
+
+	cooldown = state.get("cooldown", 0)
+	if cooldown:
+		state["cooldown"] = cooldown - 1
+		return
+
+	target = camera_viewer.target_time
+	if target * 0.6 <= average <= target * 1.2:
+		return
+
+	# Render cost grows with the pixel count, so scale quality by the square root of the time ratio.
+	quality = state.get("quality", camera_viewer.quality)
+	quality = quality * (target / max(average, 0.01)) ** 0.5
+	quality = min(max(round(quality / 5) * 5, 5), 100)
+
+	if quality != state.get("quality", camera_viewer.quality):
+		state["quality"] = quality
+		state["cooldown"] = 8
+
+def is_render_throttled(context, camera_viewer, state, offscreen):
+	# Never hold back the first render into a freshly acquired buffer.
+	if state.get("offscreen") != get_offscreen_serial(offscreen):
+		return False
+
+	if context.screen.is_animation_playing and camera_viewer.playback_step > 1:
+		render_frame = state.get("render_frame")
+		if render_frame is not None and abs(context.scene.frame_current - render_frame) < camera_viewer.playback_step:
+			return True
+
+	if camera_viewer.max_fps:
+		remaining = state.get("render_stamp", 0) + 1/camera_viewer.max_fps - time.perf_counter()
+		if remaining > 0:
+			# Make sure the held back change still shows up once the interval has passed.
+			tag_viewer_redraw_later(context, state, remaining)
+			return True
+
+	return False
+
+def tag_viewer_redraw():
+	for window in bpy.context.window_manager.windows:
+		for area in window.screen.areas:
+			if area.type == 'VIEW_3D':
+				area.tag_redraw()
+
+def tag_viewer_redraw_later(context, state, interval):
+	# One pending redraw per viewer, for the 3D views of the screen it is drawn on. An earlier request replaces a later one.
+	due = time.perf_counter() + interval
+	timer = state.get("redraw_timer")
+	if timer and bpy.app.timers.is_registered(timer):
+		if state["redraw_due"] <= due:
+			return
+		bpy.app.timers.unregister(timer)
+
+	screen = context.screen.as_pointer()
+	def timer():
+		state.pop("redraw_timer", None)
+		for window in bpy.context.window_manager.windows:
+			if window.screen.as_pointer() == screen:
+				for area in window.screen.areas:
+					if area.type == 'VIEW_3D':
+						area.tag_redraw()
+
+	state["redraw_timer"] = timer
+	state["redraw_due"] = due
+	bpy.app.timers.register(timer, first_interval=interval)
+
+def cancel_viewer_redraw(state):
+	timer = state.pop("redraw_timer", None)
+	if timer and bpy.app.timers.is_registered(timer):
+		bpy.app.timers.unregister(timer)
+
+def get_refine_interval(camera_viewer):
+	# Progressive work, accumulation samples and contact sheet tiles, runs no faster than the viewer's frame rate cap.
+	if camera_viewer.max_fps:
+		return max(refine_interval, 1/camera_viewer.max_fps)
+	return refine_interval
+
+def get_property_key(data, keys):
+	values = []
+	for key in keys:
+		value = getattr(data, key, None)
+		if hasattr(value, '__len__') and not isinstance(value, str):
+			value = tuple(value)
+		values.append(value)
+	return tuple(values)
+
+def get_render_key(context, camera, space, offscreen, view_layer, color_mode):
+	scene = context.scene
+	render = scene.render
+	data = camera.data
+	# Fast renders unmanaged and applies exposure and gamma when drawing, so they must not trigger a re-render.
+	color_key = color_mode
+	if color_mode == 'SCENE':
+		color_key = get_property_key(scene.view_settings, view_keys), scene.display_settings.display_device
+
+	return (
+		camera.as_pointer(),
+		tuple(tuple(row) for row in camera.matrix_world),
+		data.type, data.lens, data.ortho_scale, data.sensor_fit, data.sensor_width, data.sensor_height,
+		data.shift_x, data.shift_y, data.clip_start, data.clip_end,
+		render.resolution_x, render.resolution_y, render.pixel_aspect_x, render.pixel_aspect_y, render.engine,
+		render.use_multiview, render.views_format, get_property_key(data.stereo, stereo_keys),
+		color_key,
+		get_property_key(space.shading, shading_keys),
+		get_property_key(space.overlay, overlay_keys),
+		scene.frame_current, scene.frame_subframe,
+		view_layer.as_pointer(),
+		scene_updates["depsgraph"], scene_updates["frame"],
+		get_offscreen_serial(offscreen),
+	)
+
+@persistent
+def tag_depsgraph_update(scene, depsgraph):
+	scene_updates["depsgraph"] += 1
+	# Collection links and layer collection flags are all a viewer filter layer depends on.
+	if depsgraph and (depsgraph.id_type_updated('COLLECTION') or depsgraph.id_type_updated('SCENE')):
+		scene_updates["collections"] += 1
+
+@persistent
+def tag_frame_change(scene, depsgraph):
+	scene_updates["frame"] += 1
+
+@persistent
+def reset_viewer_states(self, context):
+	for state in viewer_states.values():
+		cancel_viewer_redraw(state)
+	viewer_states.clear()
+	space_cache.clear()
+	batch_cache.clear()
+	layout_cache.clear()
+	hit_indices.clear()
+	free_offscreens()
+
 @persistent
 def check_viewer_property(self, context):
-	if bpy.context.screen.camera_viewer.viewer_toggle == True:
-		offscreen = get_offscreen(bpy.context)
-		dns["draw_viewer_toggle"] = bpy.types.SpaceView3D.draw_handler_add(draw_viewer_toggle, (bpy.context, offscreen), 'WINDOW', 'POST_PIXEL')
+	store_viewer_screen_names()
+	migrate_viewer_cameras()
+	subscribe_viewer_messages()
+	sync_draw_handler()
+
+@persistent
+def reset_viewer_spaces(self, context):
+	space_cache.clear()
+	# Undo rebuilds the objects, cached cameras would point at freed memory.
+	for state in viewer_states.values():
+		state.pop("camera", None)
+		state.pop("filter_layer", None)
+
+def register_viewer_screens():
+	store_viewer_screen_names()
+	migrate_viewer_cameras()
+	sync_draw_handler()
 		
 def draw_viewport_outline():
-	if bpy.context.screen.camera_viewer.viewport_outline == False:
-		return
-
-	wdith = bpy.context.region.width-1
-	height = bpy.context.region.height
-	vertices = [
-		(0, 0),
-		(wdith, 0),
-		(wdith, height),
-		(0, height),
-		(0, 0),
-	]
-	shader = gpu.shader.from_builtin("UNIFORM_COLOR")
-	gpu.state.blend_set("ALPHA")
-	gpu.state.line_width_set(4)
-	batch = batch_for_shader(shader, "LINE_STRIP", {"pos": vertices})
-	shader.bind()
+	with profile(bpy.context, "viewport_outline"):
+		if bpy.context.screen.camera_viewer.viewport_outline == False:
+			return
 
-	if hasattr(bpy.context.screen, "camera_viewer"):
-		pass
+		wdith = bpy.context.region.width-1
+		height = bpy.context.region.height
+		vertices = (
+			(0, 0),
+			(wdith, 0),
+			(wdith, height),
+			(0, height),
+			(0, 0),
+		)
+		shader = gpu.shader.from_builtin("UNIFORM_COLOR")
+		gpu.state.blend_set("ALPHA")
+		gpu.state.line_width_set(4)
+		batch = get_batch(("viewport_outline", bpy.context.region.as_pointer()), shader, "LINE_STRIP", {"pos": vertices})
+		shader.bind()
+
+		if hasattr(bpy.context.screen, "camera_viewer"):
+			pass
+
+		if (bpy.context.screen.camera_viewer.viewer_toggle == False) or (bpy.context.screen.camera_viewer.viewer_toggle and bpy.context.screen.camera_viewer.disable_enter):
+			if bpy.context.screen.is_animation_playing:
+				if bpy.context.screen.camera_viewer.viewer_toggle and bpy.context.space_data.region_3d.view_perspective != 'CAMERA':
+					return
+				if bpy.context.scene.sync_mode == 'FRAME_DROP':
+					shader.uniform_float("color", (1,0.85,0,1))
+				elif bpy.context.scene.sync_mode == 'AUDIO_SYNC':
+					shader.uniform_float("color", (0.25,0.5,1,1))
+				else:
+					shader.uniform_float("color", (1,0.35,0.35,1))
+			elif bpy.context.space_data.region_3d.view_perspective == 'CAMERA':
+				shader.uniform_float("color", (0.486275,1,0.67451,1))
+			batch.draw(shader)
 
-	if (bpy.context.screen.camera_viewer.viewer_toggle == False) or (bpy.context.screen.camera_viewer.viewer_toggle and bpy.context.screen.camera_viewer.disable_enter):
-		if bpy.context.screen.is_animation_playing:
-			if bpy.context.screen.camera_viewer.viewer_toggle and bpy.context.space_data.region_3d.view_perspective != 'CAMERA':
-				return
-			if bpy.context.scene.sync_mode == 'FRAME_DROP':
-				shader.uniform_float("color", (1,0.85,0,1))
-			elif bpy.context.scene.sync_mode == 'AUDIO_SYNC':
-				shader.uniform_float("color", (0.25,0.5,1,1))
-			else:
-				shader.uniform_float("color", (1,0.35,0.35,1))
-		elif bpy.context.space_data.region_3d.view_perspective == 'CAMERA':
-			shader.uniform_float("color", (0.486275,1,0.67451,1))
-		batch.draw(shader)
+		if not (bpy.context.screen.is_animation_playing and (bpy.context.screen.camera_viewer.viewer_toggle == False or bpy.context.screen.camera_viewer.disable_enter)):
+			if bpy.context.object:
+				if bpy.context.scene.tool_settings.use_keyframe_insert_auto == True:
+					shader.uniform_float("color", (0.5,0,0,1))
+					batch.draw(shader)
+				elif bpy.context.object.mode == 'POSE':
+					shader.uniform_float("color", (0.6,0.6,0.6,1))
 
-	if not (bpy.context.screen.is_animation_playing and (bpy.context.screen.camera_viewer.viewer_toggle == False or bpy.context.screen.camera_viewer.disable_enter)):
-		if bpy.context.object:
-			if bpy.context.scene.tool_settings.use_keyframe_insert_auto == True:
-				shader.uniform_float("color", (0.5,0,0,1))
-				batch.draw(shader)
-			elif bpy.context.object.mode == 'POSE':
-				shader.uniform_float("color", (0.6,0.6,0.6,1))
+					batch.draw(shader)
 
+			if bpy.context.space_data.shading.use_compositor == 'ALWAYS' or (bpy.context.space_data.shading.use_compositor == 'CAMERA' and bpy.context.space_data.region_3d.view_perspective == 'CAMERA'):
+				shader.uniform_float("color", (0.394198,0.569371,1,1))
 				batch.draw(shader)
 
-		if bpy.context.space_data.shading.use_compositor == 'ALWAYS' or (bpy.context.space_data.shading.use_compositor == 'CAMERA' and bpy.context.space_data.region_3d.view_perspective == 'CAMERA'):
-			shader.uniform_float("color", (0.394198,0.569371,1,1))
-			batch.draw(shader)
-
 def draw_camera_name(context, camera_viewer, camera, x, y, width, height):
 	font_id = 0  # XXX, need to find out how best to get this.
 
@@ -169,6 +1119,8 @@ def draw_camera_statuses(context, camera_viewer, camera, x, y, width, height):
 
 		if camera_viewer.statuses == 'EDIT':
 			text = f'Size - {str(round(camera_viewer.size,2))} | Quality {str(camera_viewer.quality)} %'
+			if camera_viewer.adaptive_quality:
+				text += f' (Auto {str(get_effective_quality(camera_viewer))} %)'
 
 			if camera_viewer.quality == 50:
 				blf.color(font_id, 1, 1, 0, 1)
@@ -183,6 +1135,10 @@ def draw_camera_statuses(context, camera_viewer, camera, x, y, width, height):
 				text = f'Scale - {str(camera.data.ortho_scale)}'
 
 			blf.color(font_id, 1, 1, 1, 1)
+		else:
+			text = f'Auto Quality - {str(get_effective_quality(camera_viewer))} %'
+
+			blf.color(font_id, 1, 1, 1, 0.6)
 
 		blf.size(font_id, 16)
 		dimensions = blf.dimensions(font_id, text)
@@ -196,22 +1152,22 @@ def draw_camera_statuses(context, camera_viewer, camera, x, y, width, height):
 
 		blf.disable(font_id, blf.SHADOW)
 
-def draw_outline(context, x, y, width, height, thickness, color):
-	vertices = [
+def draw_outline(context, camera_viewer, x, y, width, height, thickness, color):
+	vertices = (
 		(x, y),
 		(x + width, y),
 		(x + width, y + height),
 		(x, y + height),
 		(x, y),
-	]
+	)
 
 	shader = gpu.shader.from_builtin("UNIFORM_COLOR")
-	batch = batch_for_shader(shader, "LINE_STRIP", {"pos": vertices})
+	batch = get_batch(("outline", context.region.as_pointer(), camera_viewer.as_pointer()), shader, "LINE_STRIP", {"pos": vertices})
 
 	shader.bind()
-	if context.screen.camera_viewer.statuses == 'EDIT':
+	if camera_viewer.statuses == 'EDIT':
 		shader.uniform_float("color", (0.394198,0.569371,1,1))
-	elif context.screen.camera_viewer.statuses == 'Navigation':
+	elif camera_viewer.statuses == 'Navigation':
 		shader.uniform_float("color", (1, 0.6, 0, 1))
 	elif context.screen.is_animation_playing:
 		if context.scene.sync_mode == 'FRAME_DROP':
@@ -230,87 +1186,635 @@ def draw_outline(context, x, y, width, height, thickness, color):
 	batch.draw(shader)
 	gpu.state.blend_set("NONE")
 
-def draw_viewer_toggle(context, offscreen):
-	context = bpy.context
-	if context.screen.camera_viewer.viewer_toggle == True:
-		camera_viewer = context.screen.camera_viewer
+def get_guide_geometry(x, y, width, height, camera_viewer, safe_areas):
+	lines = []
+	sections = []
+	if camera_viewer.guide_thirds:
+		sections += [1/3, 2/3]
+	if camera_viewer.guide_golden:
+		sections += [1 - 1/golden_ratio, 1/golden_ratio]
+	for section in sections:
+		lines += [(x + width*section, y), (x + width*section, y + height)]
+		lines += [(x, y + height*section), (x + width, y + height*section)]
+
+	if camera_viewer.guide_safe_areas:
+		# Margins are fractions of half the frame on each side, as in the camera view.
+		for margin_x, margin_y in (safe_areas.title, safe_areas.action):
+			left, right = x + margin_x*width/2, x + width - margin_x*width/2
+			bottom, top = y + margin_y*height/2, y + height - margin_y*height/2
+			lines += [(left, bottom), (right, bottom), (right, bottom), (right, top),
+					(right, top), (left, top), (left, top), (left, bottom)]
+
+	mask = []
+	if camera_viewer.letterbox:
+		aspect = camera_viewer.letterbox_aspect
+		if aspect > width / height:
+			bar = (height - width / aspect) / 2
+			bars = ((x, y, width, bar), (x, y + height - bar, width, bar))
+		else:
+			bar = (width - height * aspect) / 2
+			bars = ((x, y, bar, height), (x + width - bar, y, bar, height))
+		for left, bottom, bar_width, bar_height in bars:
+			mask += [(left, bottom), (left + bar_width, bottom), (left + bar_width, bottom + bar_height),
+					(left, bottom), (left + bar_width, bottom + bar_height), (left, bottom + bar_height)]
+
+	return tuple(lines), tuple(mask)
+
+def draw_guides(context, camera_viewer, state, x, y, width, height):
+	# The framing guides replace the overlay engine in the offscreen, the geometry only rebuilds when the viewer
+	# moves or a guide setting changes.
+	safe_areas = context.scene.safe_areas
+	key = (
+		x, y, width, height,
+		camera_viewer.guide_thirds, camera_viewer.guide_golden, camera_viewer.guide_safe_areas,
+		tuple(safe_areas.title), tuple(safe_areas.action),
+		camera_viewer.letterbox, camera_viewer.letterbox_aspect,
+	)
 
-		if not camera_viewer.active_camera:
-			if camera_viewer.lock_camera and camera_viewer.camera:
-				camera = bpy.data.objects[camera_viewer.camera]
-			else:
-				camera = context.scene.camera
+	shader = gpu.shader.from_builtin("UNIFORM_COLOR")
+	guides = state.get("guides")
+	if guides is None or guides[0] != key:
+		lines, mask = get_guide_geometry(x, y, width, height, camera_viewer, safe_areas)
+		name = (context.region.as_pointer(), camera_viewer.as_pointer())
+		guides = state["guides"] = (
+			key,
+			get_batch(("guide_lines",) + name, shader, 'LINES', {"pos": lines}) if lines else None,
+			get_batch(("guide_mask",) + name, shader, 'TRIS', {"pos": mask}) if mask else None,
+		)
+
+	key, lines, mask = guides
+	if not (lines or mask):
+		return
+
+	shader.bind()
+	gpu.state.blend_set("ALPHA")
+	if mask:
+		shader.uniform_float("color", (0, 0, 0, camera_viewer.letterbox_opacity))
+		mask.draw(shader)
+	if lines:
+		shader.uniform_float("color", camera_viewer.guide_color)
+		gpu.state.line_width_set(1)
+		lines.draw(shader)
+	gpu.state.blend_set("NONE")
+
+def get_scene_cameras(context, state):
+	if state.get("cameras_update") != scene_updates["depsgraph"]:
+		state["cameras"] = [ob.name for ob in context.scene.objects if ob.type == 'CAMERA']
+		state["cameras_update"] = scene_updates["depsgraph"]
+	return state["cameras"]
+
+def get_contact_sheet_columns(count):
+	# A square grid keeps every tile at the render aspect ratio.
+	return max(math.ceil(math.sqrt(count)), 1)
+
+def get_contact_sheet_camera(camera_viewer, location, x, y, width, height):
+	cameras = get_viewer_state(camera_viewer).get("cameras", ())
+	columns = get_contact_sheet_columns(len(cameras))
+	column = int((location[0] - x) / width * columns)
+	row = int((y + height - location[1]) / height * columns)
+	index = row * columns + column
+	if 0 <= column < columns and 0 <= row < columns and index < len(cameras):
+		return cameras[index]
+	return None
+
+def blit_texture(offscreen, texture, x, y, width, height, alpha=1.0):
+	# Copy a texture into a part of an offscreen, the rectangle is given in normalized device coordinates.
+	# Below 1 the alpha mixes the texture over what the offscreen already holds.
+	shader = gpu.shader.from_builtin('IMAGE_COLOR')
+	batch = get_batch(
+		("blit", x, y, width, height), shader, 'TRI_FAN',
+		{
+			"pos": ((x, y), (x+width, y), (x+width, y+height), (x, y+height)),
+			"texCoord": ((0,0), (1,0), (1,1), (0,1)),
+		},
+	)
+
+	with offscreen.bind():
+		with gpu.matrix.push_pop():
+			gpu.matrix.load_identity()
+			with gpu.matrix.push_pop_projection():
+				gpu.matrix.load_projection_matrix(Matrix.Identity(4))
+				gpu.state.blend_set('NONE' if alpha >= 1 else 'ALPHA')
+				shader.uniform_sampler("image", texture)
+				shader.uniform_float("color", (1, 1, 1, alpha))
+				batch.draw(shader)
+				gpu.state.blend_set('NONE')
+
+def halton(index, base):
+	result = 0
+	fraction = 1
+	while index:
+		fraction /= base
+		result += fraction * (index % base)
+		index //= base
+	return result
+
+def accumulate_viewer(context, camera_viewer, camera, space, state, offscreen, render_key, width, height):
+	# Idle redraws add one sub-pixel jittered render to the history, any change to the render key starts over.
+	if state.get("history_key") != state.get("render_key"):
+		# Leave the redraw that just rendered alone and start on the next one.
+		state["history_key"] = state.get("render_key")
+		state["samples"] = 1
+		tag_viewer_redraw_later(context, state, get_refine_interval(camera_viewer))
+		return offscreen
+
+	samples = state.get("samples", 1)
+	history = acquire_offscreen((camera_viewer.as_pointer(), 'history'), offscreen.width, offscreen.height)
+
+	if samples < camera_viewer.accumulate_samples and state.get("render_key") == render_key:
+		if samples == 1:
+			blit_texture(history, offscreen.texture_color, -1, -1, 2, 2)
+
+		sample = acquire_offscreen((camera_viewer.as_pointer(), 'sample'), offscreen.width, offscreen.height)
+		jitter = Matrix.Translation(((halton(samples, 2) - 0.5) * 2 / offscreen.width, (halton(samples, 3) - 0.5) * 2 / offscreen.height, 0))
+
+		sample.draw_view3d(
+			context.scene,
+			get_viewer_layer(context, camera_viewer),
+			space,
+			context.region,
+			camera.matrix_world.inverted(),
+			jitter @ camera.calc_matrix_camera(context.evaluated_depsgraph_get(), x=width, y=height),
+			do_color_management=get_color_mode(context, camera_viewer) == 'SCENE')
+
+		# Running mean, the new sample weighs 1/(n+1) against the n already in the history.
+		blit_texture(history, sample.texture_color, -1, -1, 2, 2, alpha=1 / (samples + 1))
+		samples = state["samples"] = samples + 1
+
+		if samples < camera_viewer.accumulate_samples:
+			tag_viewer_redraw_later(context, state, get_refine_interval(camera_viewer))
+
+	return history if samples > 1 else offscreen
+
+def get_stereo_mode(context, camera_viewer):
+	# Stereo only applies when the scene renders stereo 3D, and the contact sheet always shows the plain cameras.
+	render = context.scene.render
+	if camera_viewer.contact_sheet or not render.use_multiview or render.views_format != 'STEREO_3D':
+		return 'NONE'
+	return camera_viewer.stereo_mode
+
+def get_stereo_eye(camera, eye, projection_matrix, width, height):
+	# Same eye placement as Blender's stereo cameras: the pivot decides which eye sits on the camera,
+	# off-axis shifts the frustum so both eyes meet at the convergence plane and toe-in turns the eyes instead.
+	data = camera.data
+	stereo = data.stereo
+	distance = stereo.interocular_distance
+	if stereo.pivot == 'LEFT':
+		offset = 0 if eye == 'LEFT' else distance
+	elif stereo.pivot == 'RIGHT':
+		offset = -distance if eye == 'LEFT' else 0
+	else:
+		offset = -distance / 2 if eye == 'LEFT' else distance / 2
+
+	convergence = max(stereo.convergence_distance, 0.00001)
+	matrix = camera.matrix_world @ Matrix.Translation((offset, 0, 0))
+
+	if stereo.convergence_mode == 'TOE':
+		matrix = matrix @ Matrix.Rotation(math.atan2(offset, convergence), 4, 'Y')
+	elif stereo.convergence_mode == 'OFFAXIS' and offset:
+		if data.sensor_fit == 'VERTICAL':
+			sensor, fit = data.sensor_height, height
 		else:
-			if context.active_object.type == 'CAMERA':
-				camera = context.active_object
-			else:
-				return
-			
-		if camera_viewer.disable_enter and context.space_data.region_3d.view_perspective == 'CAMERA':
-			return
-			
+			sensor, fit = data.sensor_width, width if data.sensor_fit == 'HORIZONTAL' else max(width, height)
+		if data.type == 'ORTHO':
+			shift = -offset / data.ortho_scale
+		else:
+			shift = -offset * data.lens / (convergence * sensor)
+		# A shift is a fraction of the fitted side, in clip space it moves x by twice that.
+		projection_matrix = Matrix.Translation((2 * shift * fit / width, 0, 0)) @ projection_matrix
+
+	return matrix.inverted(), projection_matrix
+
+def draw_stereo(context, camera_viewer, camera, space, stereo, offscreen, projection_matrix, width, height):
+	# One eye renders straight into the viewer offscreen. For both eyes the offscreen renders each eye in turn
+	# and copies it into its half of a double width buffer, which the preview shader shows or composites.
+	eyes = (stereo,) if stereo in {'LEFT', 'RIGHT'} else ('LEFT', 'RIGHT')
+	pair = None
+	if len(eyes) == 2:
+		pair = acquire_offscreen((camera_viewer.as_pointer(), 'stereo'), offscreen.width * 2, offscreen.height)
+
+	for index, eye in enumerate(eyes):
+		view_matrix, eye_projection = get_stereo_eye(camera, eye, projection_matrix, width, height)
+		offscreen.draw_view3d(
+			context.scene,
+			get_viewer_layer(context, camera_viewer),
+			space,
+			context.region,
+			view_matrix,
+			eye_projection,
+			do_color_management=get_color_mode(context, camera_viewer) == 'SCENE')
+		if pair:
+			blit_texture(pair, offscreen.texture_color, index - 1, -1, 1, 2)
+	return pair or offscreen
+
+def draw_contact_sheet(context, camera_viewer, space, state):
+	# The sheet has a buffer of its own so the viewer's last camera render survives switching back and forth.
+	atlas = get_offscreen(context, camera_viewer, 'atlas')
+	cameras = get_scene_cameras(context, state)
+	columns = get_contact_sheet_columns(len(cameras))
+	tile = acquire_offscreen((camera_viewer.as_pointer(), 'tile'), atlas.width // columns, atlas.height // columns)
+	view_layer = get_viewer_layer(context, camera_viewer)
+
+	tile_keys = state.setdefault("tile_keys", {})
+	if state.get("atlas") != (get_offscreen_serial(atlas), tuple(cameras)):
+		# New buffer or a different set of cameras, start the sheet over.
+		tile_keys.clear()
+		with atlas.bind():
+			gpu.state.active_framebuffer_get().clear(color=(0.0, 0.0, 0.0, 1.0))
+		state["atlas"] = (get_offscreen_serial(atlas), tuple(cameras))
+
+	color_mode = get_color_mode(context, camera_viewer)
+	stale = []
+	for index, name in enumerate(cameras):
+		camera = bpy.data.objects.get(name)
 		if camera:
+			render_key = get_render_key(context, camera, space, tile, view_layer, color_mode)
+			if tile_keys.get(name) != render_key:
+				stale.append((index, camera, render_key))
+
+	# Render a few tiles per redraw, continuing after the last one so every camera gets its turn.
+	cursor = state.get("tile_cursor", 0)
+	stale.sort(key=lambda item: (item[0] - cursor) % len(cameras))
+
+	for index, camera, render_key in stale[:camera_viewer.contact_sheet_rate]:
+		tile.draw_view3d(
+			context.scene,
+			view_layer,
+			space,
+			context.region,
+			camera.matrix_world.inverted(),
+			camera.calc_matrix_camera(context.evaluated_depsgraph_get(), x=tile.width, y=tile.height),
+			do_color_management=color_mode == 'SCENE')
+
+		column = index % columns
+		row = index // columns
+		blit_texture(atlas, tile.texture_color, -1 + 2*column/columns, 1 - 2*(row + 1)/columns, 2/columns, 2/columns)
+
+		tile_keys[camera.name] = render_key
+		state["tile_cursor"] = index + 1
+
+	if len(stale) > camera_viewer.contact_sheet_rate:
+		tag_viewer_redraw_later(context, state, get_refine_interval(camera_viewer))
+
+	return atlas
+
+def draw_contact_sheet_names(cameras, x, y, width, height):
+	font_id = 0
+	columns = get_contact_sheet_columns(len(cameras))
+
+	blf.enable(font_id, blf.SHADOW)
+	blf.color(font_id, 1, 1, 1, 1)
+	blf.size(font_id, 11)
+	for index, name in enumerate(cameras):
+		column = index % columns
+		row = index // columns
+		blf.position(font_id, x + column*width/columns + 4, y + height - (row + 1)*height/columns + 4, 0)
+		blf.draw(font_id, name)
+	blf.disable(font_id, blf.SHADOW)
+
+def update_scope(context, camera_viewer, state, offscreen):
+	# Scopes come from a small readback, rebuilt at most scope_rate times a second and never taking more than
+	# scope_budget of the time in between, however slow the readback turns out.
+	source = (state.get("render_key"), state.get("samples"), camera_viewer.scope)
+	if state.get("scope_source") == source:
+		return
 
-			x = camera_viewer.x
-			y = camera_viewer.y
-			region_width = context.region.width
-			region_height = context.region.height
-			for r in context.area.regions:
-				if r.type == 'UI':
-					n_panel = r.width
-					break
-			for r in context.area.regions:
-				if r.type == 'TOOLS':
-					tool_panel = r.width
+	remaining = state.get("scope_next", 0) - time.perf_counter()
+	if remaining > 0:
+		tag_viewer_redraw_later(context, state, remaining)
+		return
+
+	start = time.perf_counter()
+
+	width = scope_samples
+	height = max(int(scope_samples * offscreen.height / max(offscreen.width, 1)), 1)
+	small = acquire_offscreen((camera_viewer.as_pointer(), 'scope'), width, height)
+	blit_texture(small, offscreen.texture_color, -1, -1, 2, 2)
+
+	buffer = small.texture_color.read()
+	buffer.dimensions = width * height * 4
+	pixels = np.array(buffer, dtype=np.float32).reshape(height, width, 4)[..., :3]
+
+	# Same transform as the viewer shader, then back to display values so the scopes read like the screen.
+	values, lut_range = get_color_table(context, camera_viewer)[1:]
+	pixels = srgb_encode(np.interp(np.clip(pixels / lut_range, 0, 1), np.linspace(0.0, 1.0, len(values)), values))
+	luma = pixels @ np.array((0.2126, 0.7152, 0.0722))
+
+	if camera_viewer.scope == 'HISTOGRAM':
+		data = [np.histogram(channel, bins=scope_levels, range=(0, 1))[0] for channel in (pixels[..., 0], pixels[..., 1], pixels[..., 2], luma)]
+	else:
+		# One luma histogram per column, drawn as points whose alpha follows the count.
+		levels = np.clip((luma * scope_levels).astype(int), 0, scope_levels - 1)
+		density = np.zeros((scope_levels, width))
+		np.add.at(density, (levels, np.broadcast_to(np.arange(width), levels.shape)), 1)
+		data = density
+
+	state["scope"] = (camera_viewer.scope, data, width)
+	state["scope_serial"] = state.get("scope_serial", 0) + 1
+	state["scope_source"] = source
+	state["scope_next"] = time.perf_counter() + max(1 / camera_viewer.scope_rate, (time.perf_counter() - start) / scope_budget)
+
+def get_scope_batches(context, camera_viewer, state, x, y, width, height):
+	key = (x, y, width, height, state["scope_serial"])
+	cached = state.get("scope_batches")
+	if cached and cached[0] == key:
+		return cached[1]
+
+	type, data, columns = state["scope"]
+	name = (context.region.as_pointer(), camera_viewer.as_pointer())
+	batches = []
+	if type == 'HISTOGRAM':
+		shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+		peak = max(max(counts.max() for counts in data), 1)
+		for channel, (counts, color) in enumerate(zip(data, ((1, 0.3, 0.3, 0.8), (0.3, 1, 0.3, 0.8), (0.4, 0.5, 1, 0.8), (1, 1, 1, 0.9)))):
+			vertices = [(x + (i + 0.5) * width / scope_levels, y + (count / peak) ** 0.5 * height) for i, count in enumerate(counts)]
+			batches.append((get_batch(("scope_histogram", channel) + name, shader, 'LINE_STRIP', {"pos": vertices}), shader, color))
+	else:
+		shader = gpu.shader.from_builtin('POINT_FLAT_COLOR')
+		levels, column = np.nonzero(data)
+		if len(levels):
+			alpha = np.sqrt(data[levels, column] / data.max())
+			vertices = np.stack((x + (column + 0.5) * width / columns, y + (levels + 0.5) * height / scope_levels), axis=-1)
+			colors = np.stack((np.full_like(alpha, 0.6), np.ones_like(alpha), np.full_like(alpha, 0.6), alpha), axis=-1)
+			batches.append((get_batch(("scope_waveform",) + name, shader, 'POINTS', {"pos": vertices.tolist(), "color": colors.tolist()}), shader, None))
+
+	state["scope_batches"] = (key, batches)
+	return batches
+
+def draw_scope(context, camera_viewer, state, x, y, width, height):
+	if not state.get("scope"):
+		return
+
+	scope_width = 256
+	scope_height = min(height, 160)
+	if 'Left' in camera_viewer.position:
+		x = x + width + 12
+	else:
+		x = x - 12 - scope_width
+
+	shader = gpu.shader.from_builtin('UNIFORM_COLOR')
+	batch = get_batch(
+		("scope_back", context.region.as_pointer(), camera_viewer.as_pointer()), shader, 'TRI_FAN',
+		{"pos": ((x, y), (x + scope_width, y), (x + scope_width, y + scope_height), (x, y + scope_height))},
+	)
+
+	gpu.state.blend_set('ALPHA')
+	shader.bind()
+	shader.uniform_float("color", (0, 0, 0, 0.5))
+	batch.draw(shader)
+
+	gpu.state.line_width_set(1)
+	gpu.state.point_size_set(2)
+	for batch, shader, color in get_scope_batches(context, camera_viewer, state, x, y, scope_width, scope_height):
+		shader.bind()
+		if color:
+			shader.uniform_float("color", color)
+		batch.draw(shader)
+	gpu.state.blend_set('NONE')
+
+def write_png(filepath, pixels):
+	# Minimal RGBA8 PNG encoder so frames can be written without touching bpy from the worker thread.
+	height, width = pixels.shape[:2]
+	rows = np.hstack((np.zeros((height, 1), dtype=np.uint8), pixels.reshape(height, width * 4)))
+
+	def chunk(tag, data):
+		return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+	with open(filepath, 'wb') as file:
+		file.write(b'\x89PNG\r\n\x1a\n')
+		file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+		file.write(chunk(b'IDAT', zlib.compress(rows.tobytes(), 6)))
+		file.write(chunk(b'IEND', b''))
+
+class Viewer_Capture:
+	def __init__(self, owner, format, directory, color_table):
+		self.owner = owner
+		self.format = format
+		self.directory = directory
+		self.color_table = color_table
+		self.pending = None
+		self.last_frame = None
+		self.frames = set()
+		self.written = 0
+		self.dropped = 0
+		self.error = None
+		self.stopping = False
+		self.encode_queue = queue.Queue(maxsize=8)
+		self.main_queue = queue.Queue()
+		self.worker = threading.Thread(target=self.run, daemon=True)
+		self.worker.start()
+
+	def capture(self, texture, frame):
+		if self.stopping or self.error or frame in self.frames:
+			return
+
+		if self.last_frame is not None and frame > self.last_frame + 1:
+			self.dropped += frame - self.last_frame - 1
+		self.last_frame = frame
+		self.frames.add(frame)
+
+		# Double buffered: copy this frame on the GPU now, read back the copy made on the previous redraw.
+		slot = (self.owner, 'capture', len(self.frames) % 2)
+		staging = acquire_offscreen(slot, texture.width, texture.height)
+		blit_texture(staging, texture, -1, -1, 2, 2)
+
+		previous = self.pending
+		self.pending = (frame, slot, staging)
+		if previous:
+			self.read(*previous)
+
+	def read(self, frame, slot, staging):
+		# The staging buffer may have been released or replaced since it was copied into.
+		current = offscreen_pool["owners"].get(slot)
+		if not current or current[1] is not staging:
+			self.dropped += 1
+			return
+
+		buffer = staging.texture_color.read()
+		buffer.dimensions = staging.width * staging.height * 4
+		try:
+			self.encode_queue.put_nowait((frame, staging.width, staging.height, np.array(buffer, dtype=np.float32)))
+		except queue.Full:
+			self.dropped += 1
+
+	def run(self):
+		while True:
+			try:
+				item = self.encode_queue.get(timeout=0.1)
+			except queue.Empty:
+				# stop() may not get its marker into a full queue, leave once the queue has drained.
+				if self.stopping:
 					break
+				continue
+			if item is None:
+				break
+			try:
+				self.encode(*item)
+			except Exception as error:
+				# The main thread sees the error on its next timer tick and stops the capture.
+				self.error = str(error)
+				break
 
-			scene = context.scene
+	def encode(self, frame, width, height, pixels):
+		pixels = pixels.reshape(height, width, 4)
 
-			render = scene.render
-			scale = render.resolution_y/1080
-			width = int(render.resolution_x/scale * camera_viewer.size/3.5)
-			height = int(render.resolution_y/scale * camera_viewer.size/3.5)
+		# Same transform as the viewer shader, so the frames match what was on screen.
+		values, lut_range = self.color_table
+		pixels[..., :3] = np.interp(np.clip(pixels[..., :3] / lut_range, 0, 1), np.linspace(0.0, 1.0, len(values)), values)
+		pixels = np.clip(pixels, 0, 1)
 
-			view_matrix = camera.matrix_world.inverted()
+		if self.format == 'PNG':
+			pixels[..., :3] = srgb_encode(pixels[..., :3])
+			write_png(os.path.join(self.directory, f'{frame:04d}.png'), (pixels[::-1] * 255 + 0.5).astype(np.uint8))
+			self.written += 1
+		else:
+			# Images and EXR files need bpy, hand the linear pixels back to the main thread.
+			self.main_queue.put((frame, width, height, pixels.ravel()))
+
+	def update_main_thread(self):
+		while not self.main_queue.empty():
+			frame, width, height, pixels = self.main_queue.get()
+			image = bpy.data.images.get('Camera Viewer Capture')
+			if image and tuple(image.size) != (width, height):
+				image.scale(width, height)
+			elif not image:
+				image = bpy.data.images.new('Camera Viewer Capture', width, height, alpha=True, float_buffer=True)
+			image.pixels.foreach_set(pixels)
+			image.update()
+
+			if self.format == 'OPEN_EXR':
+				image.filepath_raw = os.path.join(self.directory, f'{frame:04d}.exr')
+				image.file_format = 'OPEN_EXR'
+				try:
+					image.save()
+				except RuntimeError as error:
+					self.error = str(error)
+					break
+			self.written += 1
 
-			projection_matrix = camera.calc_matrix_camera(
-				context.evaluated_depsgraph_get(), x=width, y=height)
-			
-			for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-				if a.type == 'VIEW_3D':
-					if a.spaces[0]:
-						space = a.spaces[0]
-						break
+	def stop(self):
+		# Never blocks, the worker may be gone or its queue full.
+		if self.stopping:
+			return
+		self.stopping = True
+		if self.pending and not self.error:
+			self.read(*self.pending)
+		self.pending = None
+		if self.worker.is_alive():
+			try:
+				self.encode_queue.put_nowait(None)
+			except queue.Full:
+				pass
+
+	def done(self):
+		return self.stopping and not self.worker.is_alive() and (self.main_queue.empty() or self.error)
+
+	def free(self):
+		for slot in range(2):
+			release_offscreen((self.owner, 'capture', slot))
+
+def draw_viewer_toggle(context):
+	context = bpy.context
+	hud = None
+	for camera_viewer in get_viewers(context.screen):
+		if camera_viewer.viewer_toggle == True:
+			rect = draw_camera_viewer(context, camera_viewer)
+			hud = hud or rect
+
+	if hud and context.scene.camera_viewer_ui.use_profiler:
+		x, y, width, height = hud
+		draw_profile_hud(x, y + height + 36)
+
+def draw_camera_viewer(context, camera_viewer):
+	if camera_viewer.contact_sheet:
+		camera = None
+	else:
+		camera = get_viewer_camera(context, camera_viewer)
+		if not camera:
+			return
+		
+	if camera_viewer.disable_enter and context.space_data.region_3d.view_perspective == 'CAMERA':
+		return
+		
+	if camera or camera_viewer.contact_sheet:
 
-			if context.scene.render.engine == 'CYCLES' and space.shading.type in {'RENDERED'}:
-				return
+		with profile(context, "layout"):
+			x, y, width, height = get_viewer_layout(context, camera_viewer)[:4]
 
-			offscreen.draw_view3d(
-				context.scene,
-				context.view_layer,
-				space,
-				context.region,
-				view_matrix,
-				projection_matrix,
-				do_color_management=True)
-			
-			if camera_viewer.position == 'Left-Bottom':
-				x = x+20
-				y = y+20
-			elif camera_viewer.position == 'Right-Bottom':
-				x = (x+40)*-1 + region_width-width
-				y = y+20
-			elif camera_viewer.position == 'Left-Top':
-				x = x+20 + tool_panel
-				y = (y+180)*-1 + region_height-height
-			elif camera_viewer.position == 'Right-Top':
-				x = (x+20)*-1 + region_width-n_panel-width
-				y = (y+60)*-1 + region_height-height
+		space = get_viewer_space(context.screen, camera_viewer)
+		if not space:
+			return
 
+		if context.scene.render.engine == 'CYCLES' and space.shading.type in {'RENDERED'}:
+			return
+
+		state = get_viewer_state(camera_viewer)
+		stereo = get_stereo_mode(context, camera_viewer)
+
+		if camera_viewer.contact_sheet:
+			with profile(context, "contact_sheet") as section:
+				offscreen = draw_contact_sheet(context, camera_viewer, space, state)
+				if section:
+					section.target = offscreen
+		else:
+			offscreen = get_offscreen(context, camera_viewer)
+
+			# Re-render only when something the preview depends on changed, otherwise blit the last result.
+			view_layer = get_viewer_layer(context, camera_viewer)
+			color_mode = get_color_mode(context, camera_viewer)
+			render_key = get_render_key(context, camera, space, offscreen, view_layer, color_mode)
+			if state.get("render_key") != render_key and not is_render_throttled(context, camera_viewer, state, offscreen):
+				view_matrix = camera.matrix_world.inverted()
+
+				with profile(context, "camera_matrix"):
+					projection_matrix = camera.calc_matrix_camera(
+						context.evaluated_depsgraph_get(), x=width, y=height)
+
+				render_start = time.perf_counter()
+
+				with profile(context, "draw_view3d", offscreen) as section:
+					if stereo == 'NONE':
+						offscreen.draw_view3d(
+							context.scene,
+							view_layer,
+							space,
+							context.region,
+							view_matrix,
+							projection_matrix,
+							do_color_management=color_mode == 'SCENE')
+					else:
+						target = draw_stereo(context, camera_viewer, camera, space, stereo, offscreen, projection_matrix, width, height)
+						if section:
+							section.target = target
+				state["render_key"] = render_key
+				state["render_frame"] = context.scene.frame_current
+				state["render_stamp"] = render_start
+				state["offscreen"] = get_offscreen_serial(offscreen)
+
+				if camera_viewer.adaptive_quality:
+					update_quality_governor(camera_viewer, state, (time.perf_counter() - render_start) * 1000)
+
+			if stereo in {'SIDE_BY_SIDE', 'ANAGLYPH'}:
+				offscreen = acquire_offscreen((camera_viewer.as_pointer(), 'stereo'), offscreen.width * 2, offscreen.height)
+			elif camera_viewer.accumulate and stereo == 'NONE':
+				with profile(context, "accumulate") as section:
+					offscreen = accumulate_viewer(context, camera_viewer, camera, space, state, offscreen, render_key, width, height)
+					if section:
+						section.target = offscreen
+
+		if camera_viewer.scope != 'NONE' and not camera_viewer.contact_sheet:
+			with profile(context, "scope"):
+				update_scope(context, camera_viewer, state, offscreen)
+
+		capture = captures.get(camera_viewer.as_pointer())
+		if capture:
+			capture.capture(offscreen.texture_color, context.scene.frame_current)
+		
+		with profile(context, "blit"):
 			shader = get_shader()
 
-			batch = batch_for_shader(
-				shader, 'TRI_FAN',
+			batch = get_batch(
+				("viewer", context.region.as_pointer(), camera_viewer.as_pointer()), shader, 'TRI_FAN',
 				{
 					"pos": ((x, y), (x+width,y), (x+width, y+height), (x,y+height)),
 					"texCoord": ((0,0), (1,0),(1,1),(0,1)),
@@ -318,10 +1822,26 @@ def draw_viewer_toggle(context, offscreen):
 			)
 
 			shader.uniform_sampler("image", offscreen.texture_color)
-			shader.uniform_float("grayscale", False)
+			lut, lut_range = get_color_lut(context, camera_viewer)
+			shader.uniform_sampler("lut", lut)
+			shader.uniform_float("lut_range", lut_range)
+			shader.uniform_bool("value_check", camera_viewer.value_check)
+			shader.uniform_bool("false_color", camera_viewer.false_color)
+			shader.uniform_int("upscale", upscale_filters.index(camera_viewer.upscale_filter))
+			shader.uniform_float("sharpness", camera_viewer.sharpness)
+			shader.uniform_bool("anaglyph", stereo == 'ANAGLYPH')
 			batch.draw(shader)
 
-			draw_outline(context, x, y, width, height, camera_viewer.border_thickness, camera_viewer.border_color)
+		if not camera_viewer.contact_sheet and stereo != 'SIDE_BY_SIDE':
+			with profile(context, "guides"):
+				draw_guides(context, camera_viewer, state, x, y, width, height)
+
+		with profile(context, "outline"):
+			draw_outline(context, camera_viewer, x, y, width, height, camera_viewer.border_thickness, camera_viewer.border_color)
+
+		with profile(context, "text"):
+			if camera_viewer.contact_sheet:
+				draw_contact_sheet_names(state.get("cameras", ()), x, y, width, height)
 
 			if camera_viewer.show_camera_name:
 
@@ -335,7 +1855,7 @@ def draw_viewer_toggle(context, offscreen):
 								height,
 							)
 				
-			if camera_viewer.statuses:
+			if camera_viewer.statuses or camera_viewer.adaptive_quality:
 					
 				draw_camera_statuses(
 								context,
@@ -347,6 +1867,11 @@ def draw_viewer_toggle(context, offscreen):
 								height,
 							)
 
+			if camera_viewer.scope != 'NONE' and not camera_viewer.contact_sheet:
+				draw_scope(context, camera_viewer, state, x, y, width, height)
+
+		return x, y, width, height
+
 class Camera_Viewer_Navigation_Shape(bpy.types.Gizmo):
 	bl_idname = "VIEW3D_GT_Camera_Viewer_Navigation_Shape"
 	bl_target_properties = ()
@@ -354,44 +1879,15 @@ class Camera_Viewer_Navigation_Shape(bpy.types.Gizmo):
 	# Convenience wrappers around private `_gpu` module.
 	def draw_custom_shape(self, shader, select_id=None):
 		context = bpy.context
-		camera_viewer = context.screen.camera_viewer
-		scene = context.scene
-		x = camera_viewer.x
-		y = camera_viewer.y
-		region_width = context.region.width
-		region_height = context.region.height
-		render = scene.render
-		scale = render.resolution_y/1080
-		width = int(render.resolution_x/scale * camera_viewer.size/3.5)
-		height = int(render.resolution_y/scale * camera_viewer.size/3.5)
-		for r in context.area.regions:
-			if r.type == 'UI':
-				n_panel = r.width
-				break
-		for r in context.area.regions:
-			if r.type == 'TOOLS':
-				tool_panel = r.width
-				break
-
-		if camera_viewer.position == 'Left-Bottom':
-			x = x+20
-			y = y+20
-		elif camera_viewer.position == 'Right-Bottom':
-			x = (x+40)*-1 + region_width-width
-			y = y+20
-		elif camera_viewer.position == 'Left-Top':
-			x = x+20 + tool_panel
-			y = (y+180)*-1 + region_height-height
-		elif camera_viewer.position == 'Right-Top':
-			x = (x+20)*-1 + region_width-n_panel-width
-			y = (y+60)*-1 + region_height-height
+		camera_viewer = get_viewer(context.screen, self.viewer_index)
+		x, y, width, height = get_viewer_layout(context, camera_viewer)[:4]
 
 		vertices = ((x, y), (x+width,y), (x+width, y+height), (x,y+height))
 
 		indices = (
 			(0, 1, 2), (2, 1, 3))
 
-		batch = batch_for_shader(shader, 'TRIS', {"pos": vertices}, indices=indices)
+		batch = get_batch(("navigation_shape", context.region.as_pointer(), camera_viewer.as_pointer()), shader, 'TRIS', {"pos": vertices}, indices=indices)
 
 		gpu.state.blend_set('ALPHA')
 		shader.uniform_float("color", (0, 0.0, 0.0, 0.0))
@@ -413,46 +1909,19 @@ class Camera_Viewer_Navigation_Shape(bpy.types.Gizmo):
 
 	def setup(self):
 		self.custom_shape = self.new_custom_shape(self)
+		self.viewer_index = 0
 
 	def test_select(self, context, location):
-		camera_viewer = context.screen.camera_viewer
-		scene = context.scene
-		x = camera_viewer.x
-		y = camera_viewer.y
-		region_width = context.region.width
-		region_height = context.region.height
-		render = scene.render
-		scale = render.resolution_y/1080
-		width = int(render.resolution_x/scale * camera_viewer.size/3.5)
-		height = int(render.resolution_y/scale * camera_viewer.size/3.5)
-		for r in context.area.regions:
-			if r.type == 'UI':
-				n_panel = r.width
-				break
-		for r in context.area.regions:
-			if r.type == 'TOOLS':
-				tool_panel = r.width
-				break
+		# Buttons on top of the viewer win, so they keep their own highlight and click.
+		if hit_test(context.region, location) != (self.viewer_index, 'Navigation'):
+			return -1
 
-		if camera_viewer.position == 'Left-Bottom':
-			x = x+20
-			y = y+20
-		elif camera_viewer.position == 'Right-Bottom':
-			x = (x+40)*-1 + region_width-width
-			y = y+20
-		elif camera_viewer.position == 'Left-Top':
-			x = x+20 + tool_panel
-			y = (y+180)*-1 + region_height-height
-		elif camera_viewer.position == 'Right-Top':
-			x = (x+20)*-1 + region_width-n_panel-width
-			y = (y+60)*-1 + region_height-height
+		camera_viewer = get_viewer(context.screen, self.viewer_index)
+		if camera_viewer.contact_sheet:
+			x, y, width, height = get_viewer_layout(context, camera_viewer)[:4]
+			get_viewer_state(camera_viewer)["hover_camera"] = get_contact_sheet_camera(camera_viewer, location, x, y, width, height)
 
-		vertices = ((x, y), (x+width,y), (x+width, y+height), (x,y+height))
-
-		if point_in_area(location, vertices):
-			return 0  # Location matches the gizmo's position within the area
-		else:
-			return -1  # Location is outside the defined area
+		return 0
 
 class Camera_Viewer_UI_Control(bpy.types.GizmoGroup):
 	bl_idname = "Camera_Viewer_UI_Control"
@@ -461,276 +1930,108 @@ class Camera_Viewer_UI_Control(bpy.types.GizmoGroup):
 	bl_region_type = 'WINDOW'
 	bl_options = {'PERSISTENT', 'SCALE'}
 
-	viewer_gizmos = {}
-	space = None
+	space_types = (
+		'OVERLAY', 'SOLID', 'MATERIAL', 'RENDERED',
+		'DISABLED', 'CAMERA', 'ALWAYS',
+		'scene_lights', 'scene_world', 'scene_lights_render', 'scene_world_render',
+		'lock_viewer',
+	)
 
-	def prepare_space_gizmo(self, context, space, type):
-		camera_viewer = context.screen.camera_viewer
+	def get_space_gizmo_state(self, context, camera_viewer, space, type, base, compositor):
 		camera_viewer_ui = context.scene.camera_viewer_ui
 
-		gizmo = self.viewer_gizmos[type]
-
 		alpha = 0.4
 		is_alpha = 0.6
 		is_color = 0.4, 0.4, 0.4
+		icon = None
 
 		if type in ('SOLID', 'MATERIAL', 'RENDERED'):
 			if space.shading.type == type:
-				gizmo.color = 0.0, 0.5, 1.0
-				gizmo.alpha = is_alpha
+				color, alpha = (0.0, 0.5, 1.0), is_alpha
+			elif context.scene.render.engine == 'CYCLES' and type == 'RENDERED':
+				color = 1, 0, 0
 			else:
-				if context.scene.render.engine == 'CYCLES' and type == 'RENDERED':
-					gizmo.color = 1, 0, 0
-				else:
-					gizmo.color = is_color
-				gizmo.alpha = alpha
+				color = is_color
 
 		elif type in ('DISABLED', 'CAMERA', 'ALWAYS'):
 			if space.shading.use_compositor == type:
-				gizmo.color = 1.0, 0.5, 0.0
-				gizmo.alpha = is_alpha
+				color, alpha = (1.0, 0.5, 0.0), is_alpha
 			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
+				color = is_color
 
 		elif type == 'OVERLAY':
 			if space.overlay.show_overlays:
-				gizmo.color = 0.0, 0.5, 1.0
-				gizmo.alpha = is_alpha
+				color, alpha = (0.0, 0.5, 1.0), is_alpha
 			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
+				color = is_color
 
-		elif type == 'scene_lights':
-			if space.shading.use_scene_lights:
-				gizmo.color = 1.0, 0.9, 0.0
-				gizmo.alpha = is_alpha/2
-			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
-		elif type == 'scene_lights_render':
-			if space.shading.use_scene_lights_render:
-				gizmo.color = 1.0, 0.9, 0.0
-				gizmo.alpha = is_alpha/2
-			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
-		elif type == 'scene_world':
-			if space.shading.use_scene_world:
-				gizmo.color = 1.0, 0.9, 0.0
-				gizmo.alpha = is_alpha/2
+		elif type in ('scene_lights', 'scene_lights_render', 'scene_world', 'scene_world_render'):
+			if getattr(space.shading, "use_" + type):
+				color, alpha = (1.0, 0.9, 0.0), is_alpha/2
 			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
-		elif type == 'scene_world_render':   
-			if space.shading.use_scene_world_render:
-				gizmo.color = 1.0, 0.9, 0.0
-				gizmo.alpha = is_alpha/2
-			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
-		elif type == 'lock_viewer':   
-			if context.screen.camera_viewer.lock_viewer:
-				gizmo.color = 0.0, 0.5, 1.0
-				gizmo.alpha = is_alpha
-				gizmo.icon = 'VIEW_LOCKED'
-			else:
-				gizmo.color = is_color
-				gizmo.alpha = alpha
-				gizmo.icon = 'VIEW_UNLOCKED'
+				color = is_color
 
-		gizmo.backdrop_fill_alpha = 0.7
-		gizmo.color_highlight = 1.0, 1.0, 1.0
-		gizmo.alpha_highlight = 0.8
-		gizmo.use_tooltip = True
-		gizmo.line_width = 1
-		gizmo.scale_basis = 12
-
-		if not camera_viewer.active_camera:
-			if camera_viewer.lock_camera and camera_viewer.camera:
-				camera = bpy.data.objects[camera_viewer.camera]
-			else:
-				camera = context.scene.camera
-		else:
-			if context.active_object.type == 'CAMERA':
-				camera = context.active_object
+		elif type == 'lock_viewer':
+			if camera_viewer.lock_viewer:
+				color, alpha, icon = (0.0, 0.5, 1.0), is_alpha, 'VIEW_LOCKED'
 			else:
-				camera = None
-
-		base = not camera_viewer.viewer_toggle or bool(camera_viewer.statuses) or not camera or (context.scene.render.engine == 'CYCLES' and space.shading.type in {'RENDERED'}) or not camera_viewer_ui.use_ui or (camera_viewer.disable_enter and context.space_data.region_3d.view_perspective == 'CAMERA')
+				color, icon = is_color, 'VIEW_UNLOCKED'
 
 		if type in ('scene_lights', 'scene_world'):
-			gizmo.hide = base or space.shading.type not in {'MATERIAL'} or not camera_viewer_ui.use_lighting
+			hide = base or space.shading.type not in {'MATERIAL'} or not camera_viewer_ui.use_lighting
 		elif type in ('scene_lights_render', 'scene_world_render'):
-			gizmo.hide = base or space.shading.type not in {'RENDERED'} or not camera_viewer_ui.use_lighting
+			hide = base or space.shading.type not in {'RENDERED'} or not camera_viewer_ui.use_lighting
 		elif type in ('DISABLED', 'CAMERA', 'ALWAYS'):
-			if bpy.app.version >= (5, 0, 0):
-				gizmo.hide = base or space.shading.type not in {'RENDERED', 'MATERIAL'} or not camera_viewer_ui.use_compositor or not context.scene.compositing_node_group
-			else:
-				gizmo.hide = base or space.shading.type not in {'RENDERED', 'MATERIAL'} or not camera_viewer_ui.use_compositor or not context.scene.use_nodes
+			hide = base or space.shading.type not in {'RENDERED', 'MATERIAL'} or not camera_viewer_ui.use_compositor or not compositor
 		else:
-			gizmo.hide = base
-
-		return gizmo
-
-	def draw_modify(self, context, camera_viewer, x, y, width, height, region_width, region_height, tool_panel, n_panel):
-		camera_viewer_ui = context.scene.camera_viewer_ui
-		space = self.space
-
-		gizmo = self.gizmos[1]
-
-		if camera_viewer.position == 'Left-Bottom':
-			x = x+20
-			y = y+20
-		elif camera_viewer.position == 'Right-Bottom':
-			x = (x+40)*-1 + region_width-width
-			y = y+20
-		elif camera_viewer.position == 'Left-Top':
-			x = x+20 + tool_panel
-			y = (y+180)*-1 + region_height-height
-		elif camera_viewer.position == 'Right-Top':
-			x = (x+20)*-1 + region_width-n_panel-width
-			y = (y+60)*-1 + region_height-height
-
-		if not camera_viewer.active_camera:
-			if camera_viewer.lock_camera and camera_viewer.camera:
-				camera = bpy.data.objects[camera_viewer.camera]
-			else:
-				camera = context.scene.camera
-		else:
-			if context.active_object.type == 'CAMERA':
-				camera = context.active_object
-			else:
-				camera = None
-
-		gizmo.hide = not camera_viewer.viewer_toggle or bool(camera_viewer.statuses) or not camera or (context.scene.render.engine == 'CYCLES' and space.shading.type in {'RENDERED'}) or not camera_viewer_ui.use_ui
-		gizmo.matrix_basis[1][3] = y + height
-		if 'Left' in camera_viewer.position:
-			gizmo.matrix_basis[0][3] = x + width
-		if 'Right' in camera_viewer.position:
-			gizmo.matrix_basis[0][3] = x + 12
-
-	def draw_navigation(self, context, camera_viewer, x, y, width, height, region_width, region_height, tool_panel, n_panel):
-		gizmo = self.gizmos[0]
-		if camera_viewer.position == 'Left-Bottom':
-			x = x+20
-			y = y+20
-		elif camera_viewer.position == 'Right-Bottom':
-			x = (x+40)*-1 + region_width-width
-			y = y+20
-		elif camera_viewer.position == 'Left-Top':
-			x = x+20 + tool_panel
-			y = (y+180)*-1 + region_height-height
-		elif camera_viewer.position == 'Right-Top':
-			x = (x+20)*-1 + region_width-n_panel-width
-			y = (y+60)*-1 + region_height-height
-
-		gizmo.scale_basis = 150 * camera_viewer.size
-		gizmo.hide = not context.screen.camera_viewer.viewer_toggle or context.screen.camera_viewer.lock_viewer
-		gizmo.matrix_basis[0][3] = x + width/2
-		gizmo.matrix_basis[1][3] = y + height/2
-
-	def draw_space(self, context, camera_viewer, x, y, width, height, region_width, region_height, tool_panel, n_panel):
-		camera_viewer_ui = context.scene.camera_viewer_ui
-		if camera_viewer.position == 'Left-Bottom':
-			x = x+20
-			y = y+20
-		elif camera_viewer.position == 'Right-Bottom':
-			x = (x+40)*-1 + region_width-width
-			y = y+20
-		elif camera_viewer.position == 'Left-Top':
-			x = x+20 + tool_panel
-			y = (y+180)*-1 + region_height-height
-		elif camera_viewer.position == 'Right-Top':
-			x = (x+20)*-1 + region_width-n_panel-width
-			y = (y+60)*-1 + region_height-height
-
-		space = self.space
-		scale = 14
-
-		render_gz = self.prepare_space_gizmo(context, space, 'RENDERED')
-		render_gz.matrix_basis[1][3] = y + height + scale + 3
-		
-		mat_gz = self.prepare_space_gizmo(context, space, 'MATERIAL')
-		mat_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		sod_gz = self.prepare_space_gizmo(context, space, 'SOLID')
-		sod_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		ol_gz = self.prepare_space_gizmo(context, space, 'OVERLAY')
-		ol_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		dis_gz = self.prepare_space_gizmo(context, space, 'DISABLED')
-		dis_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		cam_gz = self.prepare_space_gizmo(context, space, 'CAMERA')
-		cam_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		al_gz = self.prepare_space_gizmo(context, space, 'ALWAYS')
-		al_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		sc_li_gz = self.prepare_space_gizmo(context, space, 'scene_lights')
-		sc_li_gz.matrix_basis[1][3] = y + height + scale + 3
-		
-		sc_wr_gz = self.prepare_space_gizmo(context, space, 'scene_world')
-		sc_wr_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		rd_li_gz = self.prepare_space_gizmo(context, space, 'scene_lights_render')
-		rd_li_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		rd_wr_gz = self.prepare_space_gizmo(context, space, 'scene_world_render')
-		rd_wr_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		lock_gz = self.prepare_space_gizmo(context, space, 'lock_viewer')
-		lock_gz.matrix_basis[1][3] = y + height + scale + 3
-
-		if 'Left' in camera_viewer.position:
-			render_gz.matrix_basis[0][3] = x + width - scale - (scale*2)
-			mat_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*2
-			sod_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*3
-			ol_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*4
-
-			sc_wr_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*5
-			rd_wr_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*5
-			sc_li_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*6
-			rd_li_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*6
-
-			if camera_viewer_ui.use_lighting:
-				al_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*7
-				cam_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*8
-				dis_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*9
-			else:
-				al_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*5
-				cam_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*6
-				dis_gz.matrix_basis[0][3] = x + width - scale - (scale*2)*7
-
-			lock_gz.matrix_basis[0][3] = x + width - scale
-
-		elif 'Right' in camera_viewer.position:
-			render_gz.matrix_basis[0][3] = x + scale + (scale*2)*4
-			mat_gz.matrix_basis[0][3] = x + scale + (scale*2)*3
-			sod_gz.matrix_basis[0][3] = x + scale + (scale*2)*2
-			ol_gz.matrix_basis[0][3] = x + scale + (scale*2)
-
-			sc_wr_gz.matrix_basis[0][3] = x + scale + (scale*2)*6
-			rd_wr_gz.matrix_basis[0][3] = x + scale + (scale*2)*6
-			sc_li_gz.matrix_basis[0][3] = x + scale + (scale*2)*5
-			rd_li_gz.matrix_basis[0][3] = x + scale + (scale*2)*5
-
-			if camera_viewer_ui.use_lighting:
-				dis_gz.matrix_basis[0][3] = x + scale + (scale*2)*7
-				cam_gz.matrix_basis[0][3] = x + scale + (scale*2)*8
-				al_gz.matrix_basis[0][3] =x + scale + (scale*2)*9
-			else:
-				dis_gz.matrix_basis[0][3] = x + scale + (scale*2)*5
-				cam_gz.matrix_basis[0][3] = x + scale + (scale*2)*6
-				al_gz.matrix_basis[0][3] =x + scale + (scale*2)*7
-
-			lock_gz.matrix_basis[0][3] = x + scale
-
-	def space_gizmo(self, type):
+			hide = base
+
+		return color, alpha, icon, hide
+
+	def push_gizmo(self, gizmo, previous, values):
+		# Only the values that differ from the last push are written to the gizmo.
+		# Comparing against the last push rather than the gizmo also avoids float32 RNA values never matching.
+		color, alpha, icon, hide, position, scale_basis = values
+		if previous is None:
+			previous = (None, None, None, None, None, None)
+
+		if previous[0] != color:
+			gizmo.color = color
+		if previous[1] != alpha:
+			gizmo.alpha = alpha
+		if icon is not None and previous[2] != icon:
+			gizmo.icon = icon
+		if previous[3] != hide:
+			gizmo.hide = hide
+		if previous[4] != position:
+			gizmo.matrix_basis[0][3], gizmo.matrix_basis[1][3] = position
+		if scale_basis is not None and previous[5] != scale_basis:
+			gizmo.scale_basis = scale_basis
+
+	def draw_modify(self, context, camera_viewer, gizmos, states, layout, base):
+		values = (None, None, None, base, layout.buttons['Modify'], None)
+		if states.get('Modify') != values:
+			self.push_gizmo(gizmos['Modify'], states.get('Modify'), values)
+			states['Modify'] = values
+
+	def draw_navigation(self, context, camera_viewer, gizmos, states, layout):
+		values = (None, None, None, not camera_viewer.viewer_toggle or camera_viewer.lock_viewer, layout.buttons['Navigation'], 150 * camera_viewer.size)
+		if states.get('Navigation') != values:
+			self.push_gizmo(gizmos['Navigation'], states.get('Navigation'), values)
+			states['Navigation'] = values
+
+	def draw_space(self, context, camera_viewer, gizmos, states, space, layout, base, compositor):
+		for type in self.space_types:
+			values = (*self.get_space_gizmo_state(context, camera_viewer, space, type, base, compositor), layout.buttons[type], None)
+			if states.get(type) != values:
+				self.push_gizmo(gizmos[type], states.get(type), values)
+				states[type] = values
+
+	def space_gizmo(self, type, index):
 		gizmo = self.gizmos.new("GIZMO_GT_button_2d")   #GIZMO_GT_button_2d
-		gizmo.target_set_operator("screen.set_camera_viewer_space").type = type
+		props = gizmo.target_set_operator("screen.set_camera_viewer_space")
+		props.type = type
+		props.index = index
 		gizmo.draw_options = {'BACKDROP', 'OUTLINE'}
 
 		# Can also use gz.icon_value to use a custom/generated preview icon.
@@ -758,65 +2059,23 @@ class Camera_Viewer_UI_Control(bpy.types.GizmoGroup):
 		gizmo.icon = icon
 		gizmo.hide = True
 
-		return gizmo
-
-	def draw_space_gizmo(self, context):
-		for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-			if a.type == 'VIEW_3D':
-				space = a.spaces[0]
-				break
-
-		self.space = space
-
-		self.viewer_gizmos['OVERLAY'] = self.space_gizmo('OVERLAY')
-		self.viewer_gizmos['SOLID'] = self.space_gizmo('SOLID')
-		self.viewer_gizmos['MATERIAL'] = self.space_gizmo('MATERIAL')
-		self.viewer_gizmos['RENDERED'] = self.space_gizmo('RENDERED')
-
-		self.viewer_gizmos['DISABLED'] = self.space_gizmo('DISABLED')
-		self.viewer_gizmos['CAMERA'] = self.space_gizmo('CAMERA')
-		self.viewer_gizmos['ALWAYS'] = self.space_gizmo('ALWAYS')
-
-		self.viewer_gizmos['scene_lights'] = self.space_gizmo('scene_lights')
-		self.viewer_gizmos['scene_world'] = self.space_gizmo('scene_world')
-		self.viewer_gizmos['scene_lights_render'] = self.space_gizmo('scene_lights_render')
-		self.viewer_gizmos['scene_world_render'] = self.space_gizmo('scene_world_render')
-		self.viewer_gizmos['lock_viewer'] = self.space_gizmo('lock_viewer')
-
-	def draw_prepare(self, context):
-		camera_viewer = context.screen.camera_viewer
-		if not self.space and context.screen.camera_viewer.viewer_toggle:
-			self.draw_space_gizmo(context)
-		elif self.space:
-			x = camera_viewer.x
-			y = camera_viewer.y
-			region_width = context.region.width
-			region_height = context.region.height
-			for r in context.area.regions:
-				if r.type == 'UI':
-					n_panel = r.width
-					break
-			for r in context.area.regions:
-				if r.type == 'TOOLS':
-					tool_panel = r.width
-					break
-				
-			scene = context.scene
-			render = scene.render
-			scale = render.resolution_y/1080
-			width = int(render.resolution_x/scale * camera_viewer.size/3.5)
-			height = int(render.resolution_y/scale * camera_viewer.size/3.5)
-
-			self.draw_navigation(context, camera_viewer, x, y, width, height, region_width, region_height, tool_panel, n_panel)
+		# These never change, so they are set once here instead of on every redraw.
+		gizmo.backdrop_fill_alpha = 0.7
+		gizmo.color_highlight = 1.0, 1.0, 1.0
+		gizmo.alpha_highlight = 0.8
+		gizmo.use_tooltip = True
+		gizmo.line_width = 1
+		gizmo.scale_basis = 12
 
-			self.draw_modify(context, camera_viewer, x, y, width, height, region_width, region_height, tool_panel, n_panel)
+		return gizmo
 
-			self.draw_space(context, camera_viewer, x, y, width, height, region_width, region_height, tool_panel, n_panel)
+	def draw_space_gizmo(self, index):
+		gizmos = {}
 
-	def setup(self, context):
 		gizmo = self.gizmos.new("VIEW3D_GT_Camera_Viewer_Navigation_Shape")   #GIZMO_GT_button_2d
 		gizmo.draw_options = {'BACKDROP', 'OUTLINE'}
-		gizmo.target_set_operator("screen.navigation_camera_viewer")
+		gizmo.target_set_operator("screen.navigation_camera_viewer").index = index
+		gizmo.viewer_index = index
 		gizmo.hide = True
 		gizmo.alpha = 0
 		gizmo.alpha_highlight = 0
@@ -827,10 +2086,10 @@ class Camera_Viewer_UI_Control(bpy.types.GizmoGroup):
 		# Can also use gz.icon_value to use a custom/generated preview icon.
 		gizmo.icon = 'BLANK1'
 
-		self.viewer_gizmos['Navigation'] = gizmo
+		gizmos['Navigation'] = gizmo
 
 		gizmo = self.gizmos.new("GIZMO_GT_button_2d")   #GIZMO_GT_button_2d
-		gizmo.target_set_operator("screen.modify_camera_viewer")
+		gizmo.target_set_operator("screen.modify_camera_viewer").index = index
 		gizmo.draw_options = {'BACKDROP', 'OUTLINE'}
 		gizmo.hide = True
 
@@ -845,62 +2104,181 @@ class Camera_Viewer_UI_Control(bpy.types.GizmoGroup):
 		gizmo.scale_basis = 12
 		gizmo.icon = 'BLANK1'
 
-		if context.screen.camera_viewer.viewer_toggle:
-			self.draw_space_gizmo(context)
+		gizmos['Modify'] = gizmo
 
-class Camera_Viewer_Props(bpy.types.PropertyGroup):
-	def update_toggle(self, context):
-		name = context.screen.name
-
-		if self.viewer_toggle == True:
-			# Create a new screen and set it as the active screen
-			if not bpy.data.screens.get(name + ' Camera Viewer'):
-
-				bpy.ops.screen.new()
-				if bpy.data.screens.get('Default.001'):
-					bpy.data.screens['Default.001'].name = name + ' Camera Viewer'
-				elif bpy.data.screens.get('Layout.001'):
-					bpy.data.screens['Layout.001'].name = name + ' Camera Viewer'
-				else:
-					self.report({'WARNING'}, f"View3D not found, cannot run operator : Current View3D {name}")
-					return
-				
-				context.window.screen=bpy.data.screens[name]
+		for type in self.space_types:
+			gizmos[type] = self.space_gizmo(type, index)
 
-				for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-					if a.type == 'VIEW_3D':
-						space = a.spaces[0]
-						break
-				space.overlay.show_look_dev = False
+		return gizmos
 
-			offscreen = get_offscreen(context)
-
-			dns["draw_viewer_toggle"] = bpy.types.SpaceView3D.draw_handler_add(draw_viewer_toggle, (context, offscreen), 'WINDOW', 'POST_PIXEL')
+	def draw_prepare(self, context):
+		with profile(context, "draw_prepare"):
+			viewers = get_viewers(context.screen)
+			camera_viewer_ui = context.scene.camera_viewer_ui
+
+			# Every viewer of the screen gets its own set of gizmos, created the first time it shows up.
+			while len(self.viewer_gizmos) < len(viewers):
+				self.viewer_gizmos.append(self.draw_space_gizmo(len(self.viewer_gizmos)))
+				self.gizmo_states.append({})
+				self.viewer_snapshots.append(None)
+
+			radius = 12 * context.preferences.system.ui_scale
+			compositor = bool(context.scene.compositing_node_group if IS_BLENDER_5 else context.scene.use_nodes)
+			in_camera_view = context.space_data.region_3d.view_perspective == 'CAMERA'
+			entries = []
+
+			for index, gizmos in enumerate(self.viewer_gizmos):
+				camera_viewer = viewers[index] if index < len(viewers) else None
+				space = get_viewer_space(context.screen, camera_viewer) if camera_viewer and camera_viewer.viewer_toggle else None
+				states = self.gizmo_states[index]
+
+				if not space:
+					if states:
+						for gizmo in gizmos.values():
+							gizmo.hide = True
+						states.clear()
+					self.viewer_snapshots[index] = None
+					continue
+
+				layout = get_viewer_layout(context, camera_viewer)
+				camera = get_viewer_camera(context, camera_viewer)
+				shading = space.shading
+
+				# Everything the gizmos of this viewer depend on, when it matches the last redraw there is nothing to push.
+				snapshot = (
+					layout, camera, radius, compositor, in_camera_view,
+					shading.type, shading.use_compositor, space.overlay.show_overlays,
+					shading.use_scene_lights, shading.use_scene_world, shading.use_scene_lights_render, shading.use_scene_world_render,
+					camera_viewer.viewer_toggle, camera_viewer.lock_viewer, camera_viewer.statuses, camera_viewer.size, camera_viewer.disable_enter,
+					context.scene.render.engine, camera_viewer_ui.use_ui, camera_viewer_ui.use_lighting, camera_viewer_ui.use_compositor,
+				)
+				cached = self.viewer_snapshots[index]
+				if cached and cached[0] == snapshot:
+					entries.extend(cached[1])
+					continue
+
+				modify_base = not camera_viewer.viewer_toggle or bool(camera_viewer.statuses) or not camera or (context.scene.render.engine == 'CYCLES' and shading.type in {'RENDERED'}) or not camera_viewer_ui.use_ui
+				base = modify_base or (camera_viewer.disable_enter and in_camera_view)
+
+				self.draw_navigation(context, camera_viewer, gizmos, states, layout)
+
+				self.draw_modify(context, camera_viewer, gizmos, states, layout, modify_base)
+
+				self.draw_space(context, camera_viewer, gizmos, states, space, layout, base, compositor)
+
+				viewer_entries = []
+				for type, values in states.items():
+					if values[3]:
+						continue
+					if type == 'Navigation':
+						viewer_entries.append(((layout.x, layout.y, layout.x + layout.width, layout.y + layout.height), (index, type)))
+					else:
+						x, y = layout.buttons[type]
+						viewer_entries.append(((x - radius, y - radius, x + radius, y + radius), (index, type)))
+
+				self.viewer_snapshots[index] = (snapshot, viewer_entries)
+				entries.extend(viewer_entries)
+
+			update_hit_index(context.region, entries)
 
-		elif self.viewer_toggle == False:
+	def setup(self, context):
+		self.viewer_gizmos = []
+		self.gizmo_states = []
+		self.viewer_snapshots = []
 
-			if dns.get("draw_viewer_toggle"):
+def tag_filter_update(self, context):
+	scene_updates["filter"] += 1
+	tag_viewer_redraw()
 
-				bpy.types.SpaceView3D.draw_handler_remove(dns["draw_viewer_toggle"], 'WINDOW')
+class Camera_Viewer_Filter_Item(bpy.types.PropertyGroup):
+	collection : bpy.props.PointerProperty(name = 'Collection', type=bpy.types.Collection, update=tag_filter_update, description = "Collection filtered in the viewer, with its child collections")
+	object : bpy.props.PointerProperty(name = 'Object', type=bpy.types.Object, update=tag_filter_update, description = "Object filtered in the viewer")
 
-	def update_quality(self, context):
+class Camera_Viewer_Props(bpy.types.PropertyGroup):
+	def update_toggle(self, context):
+		if self.viewer_toggle == True:
+			if ensure_viewer_screen(context, self):
+				# Operators report the warning before they get here, a plain toggle just stays off.
+				self.viewer_toggle = False
+				return
 
-		if dns.get("draw_viewer_toggle"):
+		elif self.viewer_toggle == False:
 
-			bpy.types.SpaceView3D.draw_handler_remove(dns["draw_viewer_toggle"], 'WINDOW')
+			release_viewer_offscreens(self.as_pointer())
 
-		offscreen = get_offscreen(context)
+		sync_draw_handler()
 
-		dns["draw_viewer_toggle"] = bpy.types.SpaceView3D.draw_handler_add(draw_viewer_toggle, (context, offscreen), 'WINDOW', 'POST_PIXEL')
+	def update_quality(self, context):
+		# A manual change restarts the governor from the new value.
+		state = get_viewer_state(self)
+		state.pop("quality", None)
+		state.pop("cooldown", None)
+		self.update_offscreen(context)
+
+	def update_contact_sheet(self, context):
+		if not self.contact_sheet:
+			release_offscreen((self.as_pointer(), 'tile'))
+			release_offscreen((self.as_pointer(), 'atlas'))
+		state = get_viewer_state(self)
+		state.pop("atlas", None)
+		state.pop("tile_keys", None)
+		self.update_offscreen(context)
+
+	def update_accumulate(self, context):
+		if not self.accumulate:
+			release_offscreen((self.as_pointer(), 'history'))
+			release_offscreen((self.as_pointer(), 'sample'))
+		get_viewer_state(self).pop("history_key", None)
+		self.update_offscreen(context)
+
+	def update_color(self, context):
+		# The offscreens hold managed or unmanaged colour, render everything again.
+		state = get_viewer_state(self)
+		state.pop("render_key", None)
+		state.pop("atlas", None)
+		self.update_offscreen(context)
+
+	def update_stereo(self, context):
+		if self.stereo_mode not in {'SIDE_BY_SIDE', 'ANAGLYPH'}:
+			release_offscreen((self.as_pointer(), 'stereo'))
+		get_viewer_state(self).pop("render_key", None)
+		self.update_offscreen(context)
+
+	def update_filter(self, context):
+		if self.filter_mode == 'NONE':
+			remove_filter_layers(self)
+		tag_filter_update(self, context)
+
+	def update_scope(self, context):
+		state = get_viewer_state(self)
+		for key in ("scope", "scope_source", "scope_batches"):
+			state.pop(key, None)
+		if self.scope == 'NONE':
+			release_offscreen((self.as_pointer(), 'scope'))
+		self.update_offscreen(context)
+
+	def update_camera(self, context):
+		get_viewer_state(self).pop("camera", None)
+		self.update_offscreen(context)
+
+	def poll_camera(self, object):
+		return object.type == 'CAMERA'
+
+	def update_offscreen(self, context):
+		# The offscreen is re-targeted from the pool on the next redraw.
+		for area in context.screen.areas:
+			if area.type == 'VIEW_3D':
+				area.tag_redraw()
 
 	lock_camera : bpy.props.BoolProperty(default=False, description = "Lock Viewer Active Camera")
-	camera : bpy.props.StringProperty(default='Camera')
+	camera : bpy.props.StringProperty(default='Camera', description = "Name of the locked camera in files from before the camera pointer")
+	camera_object : bpy.props.PointerProperty(name = 'Camera', type=bpy.types.Object, poll=poll_camera, update=update_camera, description = "Camera shown while the viewer camera is locked")
 	active_camera : bpy.props.BoolProperty(default=False, description = "Viewer Active Camera")
 	disable_enter : bpy.props.BoolProperty(default=True, description = "Disable viewer when entering camera view")
 	lock_viewer : bpy.props.BoolProperty(default=False, description = "Lock Camera to unable navigation mode")
 	viewer_toggle : bpy.props.BoolProperty(default=False, update=update_toggle, description = "Toggle Viewer")
 	viewport_outline : bpy.props.BoolProperty(default=False, description = "Disable viewer when entering camera view")
-	size : bpy.props.FloatProperty(name = 'References Size', default=1, min = 0.1)
+	size : bpy.props.FloatProperty(name = 'References Size', default=1, min = 0.1, update=update_offscreen)
 	x : bpy.props.FloatProperty(name = 'References Position X', default=0)
 	y : bpy.props.FloatProperty(name = 'References Position Y', default=0)
 	border_thickness : bpy.props.IntProperty(name = 'Border Thickness', default=2, min = 0, max = 10)
@@ -908,9 +2286,67 @@ class Camera_Viewer_Props(bpy.types.PropertyGroup):
 												 subtype='COLOR',
 												 size=4,  # RGBA values
 												 default=(0.0, 0.0, 0.0, 1.0), min = 0, max = 1)
+	guide_thirds : bpy.props.BoolProperty(name = 'Thirds', default=False, update=update_offscreen, description = "Show the rule of thirds guide")
+	guide_golden : bpy.props.BoolProperty(name = 'Golden', default=False, update=update_offscreen, description = "Show the golden ratio guide")
+	guide_safe_areas : bpy.props.BoolProperty(name = 'Safe Areas', default=False, update=update_offscreen, description = "Show the scene's title and action safe areas")
+	guide_color : bpy.props.FloatVectorProperty(name = 'Guide Color', subtype='COLOR', size=4, default=(1.0, 1.0, 1.0, 0.5), min = 0, max = 1, update=update_offscreen)
+	letterbox : bpy.props.BoolProperty(name = 'Letterbox', default=False, update=update_offscreen, description = "Mask the viewer to another aspect ratio")
+	letterbox_aspect : bpy.props.FloatProperty(name = 'Aspect Ratio', default=2.39, min = 0.1, soft_max = 4, update=update_offscreen, description = "Width over height of the letterbox mask")
+	letterbox_opacity : bpy.props.FloatProperty(name = 'Mask Opacity', default=0.8, min = 0, max = 1, subtype='FACTOR', update=update_offscreen, description = "Opacity of the letterbox mask")
 	quality : bpy.props.FloatProperty(name = 'Quality', default=20, min = 1, max = 100, subtype="PERCENTAGE", update=update_quality, description = "Viewer Quality")
+	adaptive_quality : bpy.props.BoolProperty(name = 'Adaptive Quality', default=False, update=update_quality, description = "Automatically adjust the viewer quality to stay within the target render time")
+	target_time : bpy.props.FloatProperty(name = 'Target Time', default=8, min = 1, max = 100, description = "Target render time of the viewer in milliseconds")
 	show_camera_name : bpy.props.BoolProperty(name = 'Show Camera Name', default=True, description = "Show Viewer Camera Name")
 	statuses : bpy.props.StringProperty(name = 'statuses', default='')
+	space_screen : bpy.props.StringProperty(name = 'Viewer Screen', default='', description = "Hidden screen holding the viewer shading and overlay settings")
+
+	contact_sheet : bpy.props.BoolProperty(name = 'Contact Sheet', default=False, update=update_contact_sheet, description = "Show every camera of the scene as a grid of thumbnails")
+	contact_sheet_rate : bpy.props.IntProperty(name = 'Cameras per Redraw', default=2, min = 1, max = 16, description = "Number of contact sheet cameras rendered per redraw")
+	capture_format : bpy.props.EnumProperty(name = 'Capture Format', default = 'PNG',
+							items = [('PNG', 'PNG', 'Write a PNG image sequence'),
+									('OPEN_EXR', 'OpenEXR', 'Write an OpenEXR image sequence'),
+									('IMAGE', 'Image', 'Write into the "Camera Viewer Capture" image'),
+									],)
+	capture_directory : bpy.props.StringProperty(name = 'Capture Directory', default='//camera_viewer/', subtype='DIR_PATH', description = "Directory the captured frames are written to")
+	upscale_filter : bpy.props.EnumProperty(name = 'Upscale Filter', default = 'SHARPEN', update=update_offscreen,
+							items = [('LINEAR', 'Linear', 'Plain bilinear sampling of the offscreen'),
+									('BICUBIC', 'Bicubic', 'Catmull-Rom filter, crisper than linear at low quality'),
+									('SHARPEN', 'Sharpen', 'Contrast adaptive sharpening, lets a lower quality look close to a higher one'),
+									],)
+	sharpness : bpy.props.FloatProperty(name = 'Sharpness', default=0.5, min = 0, max = 1, subtype='FACTOR', update=update_offscreen, description = "Strength of the sharpen filter")
+	color_mode : bpy.props.EnumProperty(name = 'Color', default = 'SCENE', update=update_color,
+							items = [('SCENE', 'Scene', "Use the scene's color management, view transform and look included"),
+									('FAST', 'Fast', 'Render without color management and apply exposure and gamma with the Standard view transform from a lookup table. Other view transforms, looks and curves use Scene'),
+									],)
+	value_check : bpy.props.BoolProperty(name = 'Value Check', default=False, update=update_offscreen, description = "Show the viewer as luminance only to check values")
+	false_color : bpy.props.BoolProperty(name = 'False Color', default=False, update=update_offscreen, description = "Colour the viewer by exposure, grey is 18% grey, green is mid grey, red is clipped")
+	scope : bpy.props.EnumProperty(name = 'Scope', default = 'NONE', update=update_scope,
+							items = [('NONE', 'None', 'No scope'),
+									('HISTOGRAM', 'Histogram', 'RGB and luma histogram beside the viewer'),
+									('WAVEFORM', 'Waveform', 'Luma waveform beside the viewer'),
+									],)
+	scope_rate : bpy.props.IntProperty(name = 'Scope Rate', default=4, min = 1, max = 30, description = "Maximum scope updates per second")
+	accumulate : bpy.props.BoolProperty(name = 'Accumulate', default=False, update=update_accumulate, description = "Refine the viewer with jittered renders while nothing changes, giving anti-aliased edges without raising the quality")
+	accumulate_samples : bpy.props.IntProperty(name = 'Samples', default=16, min = 2, max = 128, update=update_accumulate, description = "Number of renders averaged by the viewer while idle")
+	stereo_mode : bpy.props.EnumProperty(name = 'Stereo', default = 'NONE', update=update_stereo,
+							items = [('NONE', 'None', 'Show the camera without stereo'),
+									('LEFT', 'Left', 'Show the left eye'),
+									('RIGHT', 'Right', 'Show the right eye'),
+									('ANAGLYPH', 'Anaglyph', 'Red and cyan anaglyph of both eyes'),
+									('SIDE_BY_SIDE', 'Side-by-Side', 'Both eyes squeezed side by side'),
+									],
+							description = "Preview of the camera's stereo eyes, used when the scene has Stereoscopy enabled in the Stereo 3D mode")
+	filter_mode : bpy.props.EnumProperty(name = 'Filter', default = 'NONE', update=update_filter,
+							items = [('NONE', 'None', 'Render everything the scene shows'),
+									('INCLUDE', 'Include', 'Render only the listed collections and objects'),
+									('EXCLUDE', 'Exclude', 'Render everything except the listed collections and objects'),
+									],
+							description = "Collections and objects rendered by the viewer, through a view layer of its own")
+	filters : bpy.props.CollectionProperty(type = Camera_Viewer_Filter_Item)
+	filter_layer : bpy.props.StringProperty(name = 'Filter Layer', default='', description = "View layer the viewer renders while a filter is set")
+	fly_speed : bpy.props.FloatProperty(name = 'Fly Speed', default=8, min = 0.01, soft_max = 100, unit='VELOCITY', description = "Navigation mode speed of the W, A, S, D, R, F, E and Q keys, Shift doubles it and Alt slows it down")
+	max_fps : bpy.props.IntProperty(name = 'Max FPS', default=0, min = 0, max = 120, description = "Maximum viewer refresh rate, 0 for unlimited")
+	playback_step : bpy.props.IntProperty(name = 'Playback Step', default=1, min = 1, max = 24, description = "Update the viewer every N frames during animation playback")
 
 	position : bpy.props.EnumProperty(default = "Left-Bottom",
 							items = [('Left-Bottom', 'Left-Bottom', ''),
@@ -923,6 +2359,8 @@ class Camera_Viewer_UI_Props(bpy.types.PropertyGroup):
 	use_ui : bpy.props.BoolProperty(default=True, description = "Use Viewer UI Button")
 	use_lighting : bpy.props.BoolProperty(default=True, description = "Use Viewer UI Lighting Button")
 	use_compositor : bpy.props.BoolProperty(default=True, description = "Use Viewer UI Compositor Button")
+	use_profiler : bpy.props.BoolProperty(default=False, description = "Time the Camera Viewer draw code and show the results above the viewer", update=lambda self, context: profile_samples.clear())
+	profile_gpu : bpy.props.BoolProperty(default=False, description = "Read back a pixel from the buffer each timed section draws into so it includes queued GPU work. Slower, use it to compare runs")
 
 class Rest_Camera_Viewer_OT(bpy.types.Operator):
 	bl_idname = "screen.rest_camera_viewer"
@@ -930,10 +2368,12 @@ class Rest_Camera_Viewer_OT(bpy.types.Operator):
 	bl_description = "Rest Camera Viewer"
 	bl_options = {'REGISTER', 'UNDO'}
 
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
+
 	def execute(self, context):
-		mode = context.screen.camera_viewer.viewer_toggle
+		camera_viewer = get_viewer(context.screen, self.index)
 
-		camera_viewer = context.screen.camera_viewer
+		mode = camera_viewer.viewer_toggle
 
 		camera_viewer.size = 1
 		camera_viewer.x = 0
@@ -941,11 +2381,96 @@ class Rest_Camera_Viewer_OT(bpy.types.Operator):
 		camera_viewer.quality = 20
 		camera_viewer.position = 'Left-Bottom'
 
-		context.screen.camera_viewer.viewer_toggle = False
-		context.screen.camera_viewer.viewer_toggle = mode
+		camera_viewer.viewer_toggle = False
+		camera_viewer.viewer_toggle = mode
+
+		return {'FINISHED'}
+
+class Add_Camera_Viewer_OT(bpy.types.Operator):
+	bl_idname = "screen.add_camera_viewer"
+	bl_label = "Add Camera Viewer"
+	bl_description = "Add another Camera Viewer to this screen"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	def execute(self, context):
+		screen = context.screen
+		positions = ('Right-Bottom', 'Left-Top', 'Right-Top', 'Left-Bottom')
+
+		camera_viewer = screen.camera_viewers.add()
+		camera_viewer.position = positions[(len(screen.camera_viewers) - 1) % len(positions)]
+		camera_viewer.camera_object = screen.camera_viewer.camera_object
+
+		release_stale_viewers()
+
+		message = ensure_viewer_screen(context, camera_viewer)
+		if message:
+			screen.camera_viewers.remove(len(screen.camera_viewers) - 1)
+			release_stale_viewers()
+			self.report({'WARNING'}, message)
+			return {'CANCELLED'}
+
+		screen.camera_viewer_index = len(screen.camera_viewers)
+		camera_viewer.viewer_toggle = True
+
+		return {'FINISHED'}
+
+class Remove_Camera_Viewer_OT(bpy.types.Operator):
+	bl_idname = "screen.remove_camera_viewer"
+	bl_label = "Remove Camera Viewer"
+	bl_description = "Remove this Camera Viewer"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
+
+	def execute(self, context):
+		screen = context.screen
+
+		if not 0 < self.index <= len(screen.camera_viewers):
+			self.report({'WARNING'}, "The main Camera Viewer cannot be removed")
+			return {'CANCELLED'}
+
+		get_viewer(screen, self.index).viewer_toggle = False
+		remove_filter_layers(get_viewer(screen, self.index))
+		# Screens cannot be deleted outside their workspace, the hidden screen is left unclaimed and
+		# new_viewer_screen_name hands it to the next viewer added.
+		screen.camera_viewers.remove(self.index - 1)
+
+		release_stale_viewers()
+		sync_draw_handler()
+
+		screen.camera_viewer_index = self.index - 1
 
 		return {'FINISHED'}
 	
+class Add_Camera_Viewer_Filter_OT(bpy.types.Operator):
+	bl_idname = "screen.add_camera_viewer_filter"
+	bl_label = "Add Viewer Filter"
+	bl_description = "Add a collection or object to the viewer filter"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	def execute(self, context):
+		camera_viewer = get_viewer(context.screen, context.screen.camera_viewer_index)
+		if camera_viewer.filter_mode == 'NONE':
+			camera_viewer.filter_mode = 'EXCLUDE'
+		camera_viewer.filters.add()
+		return {'FINISHED'}
+
+class Remove_Camera_Viewer_Filter_OT(bpy.types.Operator):
+	bl_idname = "screen.remove_camera_viewer_filter"
+	bl_label = "Remove Viewer Filter"
+	bl_description = "Remove this entry from the viewer filter"
+	bl_options = {'REGISTER', 'UNDO'}
+
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
+
+	def execute(self, context):
+		camera_viewer = get_viewer(context.screen, context.screen.camera_viewer_index)
+		if not 0 <= self.index < len(camera_viewer.filters):
+			return {'CANCELLED'}
+		camera_viewer.filters.remove(self.index)
+		tag_filter_update(self, context)
+		return {'FINISHED'}
+
 class Toggle_Camera_Viewer_OT(bpy.types.Operator):
 	bl_idname = "screen.toggle_camera_viewer"
 	bl_label = "Toggle Camera Viewers"
@@ -953,54 +2478,212 @@ class Toggle_Camera_Viewer_OT(bpy.types.Operator):
 	bl_options = {'REGISTER', 'UNDO'}
 
 	def execute(self, context):
-		context.screen.camera_viewer.viewer_toggle = not context.screen.camera_viewer.viewer_toggle
+		camera_viewer = context.screen.camera_viewer
+		if not camera_viewer.viewer_toggle:
+			message = ensure_viewer_screen(context, camera_viewer)
+			if message:
+				self.report({'WARNING'}, message)
+				return {'CANCELLED'}
+		camera_viewer.viewer_toggle = not camera_viewer.viewer_toggle
+		return {'FINISHED'}
+
+class Export_Camera_Viewer_Profile_OT(bpy.types.Operator):
+	bl_idname = "screen.export_camera_viewer_profile"
+	bl_label = "Export Profile"
+	bl_description = "Save the Camera Viewer timings as JSON or CSV"
+	bl_options = {'REGISTER'}
+
+	filepath : bpy.props.StringProperty(subtype='FILE_PATH')
+	filter_glob : bpy.props.StringProperty(default="*.json;*.csv", options={'HIDDEN'})
+
+	@classmethod
+	def poll(cls, context):
+		return bool(profile_samples)
+
+	def execute(self, context):
+		summary = get_profile_summary()
+		filepath = bpy.path.abspath(self.filepath)
+		if not os.path.splitext(filepath)[1]:
+			filepath += ".json"
+
+		with open(filepath, "w", newline="") as file:
+			if filepath.lower().endswith(".csv"):
+				writer = csv.writer(file)
+				writer.writerow(("section", "count", "p50", "p95", "max", "mean"))
+				for name, values in summary.items():
+					writer.writerow((name, values["count"], values["p50"], values["p95"], values["max"], values["mean"]))
+			else:
+				json.dump({"sections": summary, "stats": dict(stats), "gpu_memory": offscreen_memory(), "gpu_sync": context.scene.camera_viewer_ui.profile_gpu}, file, indent=2)
+
+		self.report({'INFO'}, f"Profile saved to {filepath}")
 		return {'FINISHED'}
 
+	def invoke(self, context, event):
+		self.filepath = "camera_viewer_profile.json"
+		context.window_manager.fileselect_add(self)
+		return {'RUNNING_MODAL'}
+
+class Capture_Camera_Viewer_OT(bpy.types.Operator):
+	bl_idname = "screen.capture_camera_viewer"
+	bl_label = "Capture Camera Viewer"
+	bl_description = "Record the Camera Viewer during playback, Esc to stop"
+	bl_options = {'REGISTER'}
+
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
+
+	capture = None
+	playing = False
+	_timer = None
+
+	@classmethod
+	def poll(cls, context):
+		return any(camera_viewer.viewer_toggle for camera_viewer in get_viewers(context.screen))
+
+	def modal(self, context, event):
+		capture = self.capture
+
+		if event.type == 'ESC':
+			capture.stop()
+			if context.screen.is_animation_playing:
+				bpy.ops.screen.animation_cancel(restore_frame=False)
+			return {'RUNNING_MODAL'}
+
+		if event.type == 'TIMER':
+			capture.update_main_thread()
+
+			if capture.error:
+				capture.stop()
+
+			if context.screen.is_animation_playing:
+				self.playing = True
+			elif self.playing:
+				capture.stop()
+
+			if capture.done():
+				context.window_manager.event_timer_remove(self._timer)
+				captures.pop(capture.owner, None)
+				capture.free()
+
+				if capture.error:
+					self.report({'ERROR'}, f"Capture stopped after {capture.written} frames: {capture.error}")
+				elif capture.dropped:
+					self.report({'WARNING'}, f"Captured {capture.written} frames, dropped {capture.dropped}")
+				else:
+					self.report({'INFO'}, f"Captured {capture.written} frames")
+				return {'FINISHED'}
+
+		return {'PASS_THROUGH'}
+
+	def invoke(self, context, event):
+		camera_viewer = get_viewer(context.screen, self.index)
+		owner = camera_viewer.as_pointer()
+
+		if owner in captures:
+			captures[owner].stop()
+			return {'FINISHED'}
+
+		directory = bpy.path.abspath(camera_viewer.capture_directory)
+		if camera_viewer.capture_format != 'IMAGE':
+			if camera_viewer.capture_directory.startswith('//') and not bpy.data.filepath:
+				self.report({'WARNING'}, "Save the file first or choose an absolute capture directory")
+				return {'CANCELLED'}
+			try:
+				os.makedirs(directory, exist_ok=True)
+			except OSError as error:
+				self.report({'ERROR'}, f"Cannot create the capture directory: {error}")
+				return {'CANCELLED'}
+
+		self.capture = captures[owner] = Viewer_Capture(owner, camera_viewer.capture_format, directory, get_color_table(context, camera_viewer)[1:])
+		self._timer = context.window_manager.event_timer_add(0.1, window=context.window)
+		context.window_manager.modal_handler_add(self)
+
+		if not context.screen.is_animation_playing:
+			bpy.ops.screen.animation_play()
+
+		return {'RUNNING_MODAL'}
+
 class Modify_Camera_Viewer_OT(bpy.types.Operator):
 	bl_idname = "screen.modify_camera_viewer"
 	bl_label = "Modify Camera Viewer"
 	bl_description = "Modify Camera Viewer"
 	bl_options = {'REGISTER', 'UNDO'}
 
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
+
 	space = None
 	current_y = None
 	size = None
 	quality = None
 	_handle = None
+	_timer = None
 	position = None
+	pending = None
 
 	@classmethod
 	def poll(cls, context):
-		return context.screen.camera_viewer.viewer_toggle
+		return any(camera_viewer.viewer_toggle for camera_viewer in get_viewers(context.screen))
 	
-	def modal(self, context, event):
+	def apply_motion(self, context, camera_viewer, x, y, shift):
+		region = context.region
+		if shift:
+			position = camera_viewer.position
+			if x > region.width/3 and y < region.height/3:
+				position = 'Right-Bottom'
+			elif x < region.width/3 and y < region.height/3:
+				position = 'Left-Bottom'
+			elif x > region.width/3 and y > region.height - region.height/3:
+				position = 'Right-Top'
+			elif x < region.width/3 and y > region.height - region.height/3:
+				position = 'Left-Top'
+
+			self.current_y = y
+			if position == camera_viewer.position:
+				return False
+			camera_viewer.position = position
+			return True
+
+		if 'Bottom' in camera_viewer.position:
+			size = self.size + ((y/self.current_y)-1)*2
+		else:
+			size = self.size + ((y/self.current_y)-1)*-2
+
+		if size == camera_viewer.size:
+			return False
+		camera_viewer.size = size
+		return True
+
+	def set_value(self, data, name, value):
+		if getattr(data, name) == value:
+			return False
+		setattr(data, name, value)
+		return True
+
+	def finish(self, context, camera_viewer):
+		context.window_manager.event_timer_remove(self._timer)
+		camera_viewer.statuses = ''
 		context.area.tag_redraw()
-		camera_viewer = context.screen.camera_viewer
+
+	def modal(self, context, event):
+		camera_viewer = get_viewer(context.screen, self.index)
 		space = self.space
-		if event.type == 'ONE':
-			space.shading.type = 'SOLID'
-		elif event.type == 'TWO':
-			space.shading.type = 'MATERIAL'
-		elif event.type == 'THREE' and context.scene.render.engine != 'CYCLES':
-			space.shading.type = 'RENDERED'
+		changed = False
 
 		if event.type == 'MOUSEMOVE':
-			if event.shift:
-				if event.mouse_region_x > context.region.width/3 and event.mouse_region_y < context.region.height/3:
-					camera_viewer.position = 'Right-Bottom'
-				elif event.mouse_region_x < context.region.width/3 and event.mouse_region_y < context.region.height/3:
-					camera_viewer.position = 'Left-Bottom'
-				elif event.mouse_region_x > context.region.width/3 and event.mouse_region_y > context.region.height - context.region.height/3:
-					camera_viewer.position = 'Right-Top'
-				elif event.mouse_region_x < context.region.width/3 and event.mouse_region_y > context.region.height - context.region.height/3:
-					camera_viewer.position = 'Left-Top'
-
-				self.current_y = event.mouse_region_y
-			else:
-				if 'Bottom' in camera_viewer.position:
-					camera_viewer.size = self.size + ((event.mouse_region_y/self.current_y)-1)*2
-				elif 'Top' in camera_viewer.position:
-					camera_viewer.size = self.size + ((event.mouse_region_y/self.current_y)-1)*-2
+			# Motion is only recorded here and applied once per timer tick, however fast the mouse reports.
+			self.pending = (event.mouse_region_x, event.mouse_region_y, event.shift)
+			return {'RUNNING_MODAL'}
+
+		if event.type == 'TIMER':
+			if self.pending:
+				changed = self.apply_motion(context, camera_viewer, *self.pending)
+				self.pending = None
+
+		elif event.type == 'ONE':
+			changed = self.set_value(space.shading, "type", 'SOLID')
+		elif event.type == 'TWO':
+			changed = self.set_value(space.shading, "type", 'MATERIAL')
+		elif event.type == 'THREE' and context.scene.render.engine != 'CYCLES':
+			changed = self.set_value(space.shading, "type", 'RENDERED')
 
 		elif event.type == 'WHEELUPMOUSE':
 			# Handle mouse scroll up events
@@ -1008,43 +2691,48 @@ class Modify_Camera_Viewer_OT(bpy.types.Operator):
 				camera_viewer.quality = camera_viewer.quality + 4
 			else:
 				camera_viewer.quality = camera_viewer.quality + 5
+			changed = True
 			
 		elif event.type == 'WHEELDOWNMOUSE':
 			# Handle mouse scroll down events
 			camera_viewer.quality = camera_viewer.quality - 5
+			changed = True
 
 		elif event.type in {'R'}:
-			camera_viewer.quality = 20
+			changed = self.set_value(camera_viewer, "quality", 20)
 		elif event.type in {'S'}:
-			camera_viewer.size = 1
+			changed = self.set_value(camera_viewer, "size", 1)
 
 		elif event.type == 'LEFTMOUSE':
-			camera_viewer.statuses = ''
+			if self.pending:
+				self.apply_motion(context, camera_viewer, *self.pending)
+			self.finish(context, camera_viewer)
 			return {'FINISHED'}
 
 		elif event.type in {'RIGHTMOUSE', 'ESC'}:
 			camera_viewer.size = self.size
 			camera_viewer.quality = self.quality
-			camera_viewer.statuses = ''
 			camera_viewer.position = self.position
+			self.finish(context, camera_viewer)
 
 			return {'CANCELLED'}
 
+		if changed:
+			context.area.tag_redraw()
+
 		return {'RUNNING_MODAL'}
 	
 	def invoke(self, context, event):
 		if context.area.type == 'VIEW_3D':
-			camera_viewer = context.screen.camera_viewer
-			for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-				if a.type == 'VIEW_3D':
-					space = a.spaces[0]
-					break
-			self.space = space
+			camera_viewer = get_viewer(context.screen, self.index)
+			self.space = get_viewer_space(context.screen, camera_viewer)
 			self.size = camera_viewer.size
 			self.quality = camera_viewer.quality
 			self.current_y = event.mouse_region_y
 			self.position = camera_viewer.position
+			self.pending = None
 			camera_viewer.statuses = 'EDIT'
+			self._timer = context.window_manager.event_timer_add(modal_interval, window=context.window)
 			# The arguments we pass the callback.
 			context.window_manager.modal_handler_add(self)
 			return {'RUNNING_MODAL'}
@@ -1058,6 +2746,8 @@ class Navigation_Camera_Viewer_OT(bpy.types.Operator):
 	bl_description = "Navigation Camera Viewer"
 	bl_options = {'REGISTER', 'UNDO'}
 
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
+
 	space = None
 	camera = None
 	lens = None
@@ -1066,24 +2756,52 @@ class Navigation_Camera_Viewer_OT(bpy.types.Operator):
 	current_y = None
 	location = None
 	rotation_euler = None
+	orientation = None
 	matrix_world = None
+	panning = False
+	last = None
+	pending = None
+	held = None
+	velocity = None
+	tick = None
+	shift = False
+	alt = False
+	_timer = None
+
+	def fly(self, context, camera_viewer, camera):
+		# Velocity follows the held keys with acceleration and damping, integrated over the real time since the last tick.
+		now = time.perf_counter()
+		delta = min(now - self.tick, 0.1)
+		self.tick = now
+
+		held = self.held
+		speed = camera_viewer.fly_speed * (2 if self.shift else 0.2 if self.alt else 1)
+		target = (
+			(('D' in held) - ('A' in held)) * speed,
+			(('R' in held) - ('F' in held)) * speed,
+			(('S' in held) - ('W' in held)) * speed,
+			(('E' in held) - ('Q' in held)) * speed,
+		)
+		blend = 1 - math.exp(-(fly_acceleration if held else fly_damping) * delta)
+		self.velocity = [v + (t - v) * blend for v, t in zip(self.velocity, target)]
+
+		if not held and max(abs(v) for v in self.velocity) < 0.001:
+			self.velocity = [0.0, 0.0, 0.0, 0.0]
+			return
 
-	def move_camera_local(self, camera, x, y, z):
-		# Convert the local movement deltas to global coordinates
-		vec = Vector((x, y, z))
-		inv = camera.matrix_world.copy()
-		inv.invert()
-		# vec aligned to local axis in Blender 2.8+
-		# in previous versions: vec_rot = vec * inv
-		vec_rot = vec @ inv
-		camera.location += vec_rot
+		x, y, z, vertical = (v * delta for v in self.velocity)
+		offset = camera.matrix_world.to_quaternion() @ Vector((x, y, z))
+		offset[2] += vertical
+		camera.location += offset
+		# Carry the pan start along so a drag during the flight doesn't pull the camera back.
+		self.location += offset
 
 	@classmethod
 	def poll(cls, context):
-		return context.screen.camera_viewer.viewer_toggle
+		return any(camera_viewer.viewer_toggle for camera_viewer in get_viewers(context.screen))
 
 	def modal(self, context, event):
-		camera_viewer = context.screen.camera_viewer
+		camera_viewer = get_viewer(context.screen, self.index)
 		space = self.space
 		camera = self.camera
 			
@@ -1108,45 +2826,34 @@ class Navigation_Camera_Viewer_OT(bpy.types.Operator):
 			camera.data.lens = self.lens
 			camera.data.ortho_scale = self.ortho_scale
 
-		if event.type in {'W','A','S','D','R','F','E','Q'}:
-			if event.shift:
-				speed=1
-			elif event.alt:
-				speed=0.1
-			else:
-				speed=0.5
-			if event.type == 'W':
-				self.move_camera_local(camera, 0, 0, speed*-1)
-			elif event.type == 'A':
-				self.move_camera_local(camera, speed*-1, 0, 0)
-			elif event.type == 'S':
-				self.move_camera_local(camera, 0, 0, speed)
-			elif event.type == 'D':
-				self.move_camera_local(camera, speed, 0, 0)
-			elif event.type == 'R':
-				self.move_camera_local(camera, 0, speed, 0)
-			elif event.type == 'F':
-				self.move_camera_local(camera, 0, speed*-1, 0)
-			elif event.type == "E":
-				camera.location[2] = self.location[2] + speed
-			elif event.type == "Q":
-				camera.location[2] = self.location[2] - speed
+		if event.type in fly_keys:
+			if event.value == 'PRESS':
+				self.held.add(event.type)
+			elif event.value == 'RELEASE':
+				self.held.discard(event.type)
+			self.shift = event.shift
+			self.alt = event.alt
 
 		if event.type == 'MOUSEMOVE':
-			if event.shift:
-				x = (event.mouse_region_x - self.current_x)/(context.region.width)
-				y = (event.mouse_region_y - self.current_y)/(context.region.height)
-				self.move_camera_local(camera, x, 0, 0)
-				camera.location[2] = camera.location[2] + y
-			else:
-				camera.rotation_euler[0] = self.rotation_euler[0] + (event.mouse_region_y - self.current_y)/(context.region.height*5)
-				camera.rotation_euler[2] = self.rotation_euler[2] - (event.mouse_region_x - self.current_x)/(context.region.width*5)
+			# Motion is only recorded here, the camera is written once per timer tick so fast mice don't flood the depsgraph.
+			self.pending = (event.mouse_region_x, event.mouse_region_y, event.shift)
+
+		elif event.type == 'TIMER':
+			if self.pending:
+				self.apply_motion(context, camera, *self.pending)
+				self.pending = None
+			if self.held or any(self.velocity):
+				self.fly(context, camera_viewer, camera)
 
 		elif event.type == 'LEFTMOUSE':
+			if self.pending:
+				self.apply_motion(context, camera, *self.pending)
+			context.window_manager.event_timer_remove(self._timer)
 			camera_viewer.statuses = ''
 			return {'FINISHED'}
 
 		elif event.type in {'RIGHTMOUSE', 'ESC'}:
+			context.window_manager.event_timer_remove(self._timer)
 			camera.matrix_world = self.matrix_world
 			camera.data.lens = self.lens
 			camera.data.ortho_scale = self.ortho_scale
@@ -1155,36 +2862,72 @@ class Navigation_Camera_Viewer_OT(bpy.types.Operator):
 
 		return {'RUNNING_MODAL'}
 
+	def set_anchor(self, camera, x, y):
+		# Motion is measured from here, copies so writing the camera doesn't move the start along with it.
+		self.current_x = x
+		self.current_y = y
+		self.location = camera.location.copy()
+		self.rotation_euler = camera.rotation_euler.copy()
+		self.orientation = camera.matrix_world.to_quaternion()
+
+	def apply_motion(self, context, camera, x, y, shift):
+		# Targets are absolute from the anchor, so the result only depends on where the mouse is, not on the tick rate.
+		if shift != self.panning:
+			# Switching between pan and rotate starts over from the last applied position.
+			self.set_anchor(camera, *self.last)
+			self.panning = shift
+		self.last = (x, y)
+
+		if shift:
+			location = self.location + self.orientation @ Vector(((x - self.current_x)/(context.region.width), 0, 0))
+			location[2] += (y - self.current_y)/(context.region.height)
+			if camera.location != location:
+				camera.location = location
+			return
+
+		rotation_x = self.rotation_euler[0] + (y - self.current_y)/(context.region.height*5)
+		rotation_z = self.rotation_euler[2] - (x - self.current_x)/(context.region.width*5)
+		if camera.rotation_euler[0] != rotation_x or camera.rotation_euler[2] != rotation_z:
+			camera.rotation_euler[0] = rotation_x
+			camera.rotation_euler[2] = rotation_z
+
 	def invoke(self, context, event):
-		camera_viewer = context.screen.camera_viewer
+		camera_viewer = get_viewer(context.screen, self.index)
+		space = get_viewer_space(context.screen, camera_viewer)
+
+		if camera_viewer.contact_sheet:
+			# Clicking a tile makes that camera the one shown in the viewer.
+			name = get_viewer_state(camera_viewer).get("hover_camera")
+			if name and bpy.data.objects.get(name):
+				camera_viewer.camera_object = bpy.data.objects[name]
+				camera_viewer.lock_camera = True
+				camera_viewer.active_camera = False
+				camera_viewer.contact_sheet = False
+			return {'FINISHED'}
 
-		for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-			if a.type == 'VIEW_3D':
-				space = a.spaces[0]
-				break
-		if not camera_viewer.active_camera:
-			if camera_viewer.lock_camera and camera_viewer.camera:
-				camera = bpy.data.objects[camera_viewer.camera]
-			else:
-				camera = context.scene.camera
-		else:
-			if context.active_object.type == 'CAMERA':
-				camera = context.active_object
-			else:
-				return
+		camera = get_viewer_camera(context, camera_viewer)
+		if not camera:
+			self.report({'WARNING'}, "No camera to navigate")
+			return {'CANCELLED'}
 			
 		self.space = space
 		self.camera = camera
 
 		self.matrix_world = camera.matrix_world.copy()
-		self.location = camera.location
-		self.rotation_euler = camera.rotation_euler
-		self.current_x = event.mouse_region_x
-		self.current_y = event.mouse_region_y
+		self.set_anchor(camera, event.mouse_region_x, event.mouse_region_y)
+		self.last = (event.mouse_region_x, event.mouse_region_y)
+		self.panning = False
 		self.lens = camera.data.lens
 		self.ortho_scale = camera.data.ortho_scale
+		self.pending = None
+		self.held = set()
+		self.velocity = [0.0, 0.0, 0.0, 0.0]
+		self.tick = time.perf_counter()
+		self.shift = False
+		self.alt = False
 		camera_viewer.statuses = 'Navigation'
 
+		self._timer = context.window_manager.event_timer_add(modal_interval, window=context.window)
 		context.window_manager.modal_handler_add(self)
 		return {'RUNNING_MODAL'}
 
@@ -1195,17 +2938,16 @@ class Set_Camera_Viewer_Space_OT(bpy.types.Operator):
 	bl_options = {'REGISTER', 'UNDO'}
 
 	type : bpy.props.StringProperty(options={'HIDDEN'})
+	index : bpy.props.IntProperty(default=0, options={'HIDDEN'})
 
 	def execute(self, context):
-		for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-			if a.type == 'VIEW_3D':
-				space = a.spaces[0]
-				break
+		camera_viewer = get_viewer(context.screen, self.index)
+		space = get_viewer_space(context.screen, camera_viewer)
 
 		type = self.type
 
 		if type == 'lock_viewer':
-			context.screen.camera_viewer.lock_viewer = not context.screen.camera_viewer.lock_viewer
+			camera_viewer.lock_viewer = not camera_viewer.lock_viewer
 
 		if self.type == 'SOLID':
 			space.shading.type = 'SOLID'
@@ -1243,16 +2985,27 @@ class CAMERA_PT_Viewer(bpy.types.Panel):
 	bl_ui_units_x = 12
 
 	def draw(self, context):
-		camera_viewer = context.screen.camera_viewer
+		screen = context.screen
+		index = screen.camera_viewer_index
+		camera_viewer = get_viewer(screen, index)
 		camera_viewer_ui = context.scene.camera_viewer_ui
-		for a in bpy.data.screens[context.screen.name +' Camera Viewer'].areas:
-			if a.type == 'VIEW_3D':
-				space = a.spaces[0]
-				break
+		space = get_viewer_space(screen, camera_viewer)
 
 		layout = self.layout
 		layout.label(text='Camera Viewer')
 
+		row = layout.row(align=True)
+		row.prop(screen, "camera_viewer_index", text="Viewer")
+		row.operator("screen.add_camera_viewer", text="", icon='ADD')
+		sub = row.row(align=True)
+		sub.enabled = index > 0
+		sub.operator("screen.remove_camera_viewer", text="", icon='REMOVE').index = index
+		if index > 0:
+			layout.prop(camera_viewer, "viewer_toggle", text="Show Viewer")
+
+		if not space:
+			return
+
 		col = layout.column()
 		row = col.row()
 		row.prop(camera_viewer, "lock_viewer", text="Lock Viewer")
@@ -1260,7 +3013,7 @@ class CAMERA_PT_Viewer(bpy.types.Panel):
 		row.prop(camera_viewer, "disable_enter", text="Disabled Enter")
 		row.prop(camera_viewer, "show_camera_name", text="Show Name")
 		row = col.row()
-		row.prop(camera_viewer, "viewport_outline", text="Viewer Outline")
+		row.prop(screen.camera_viewer, "viewport_outline", text="Viewer Outline")
 		row.prop(camera_viewer_ui, "use_ui", text="Use Viewer UI")
 		row = col.row()
 		row.active = camera_viewer_ui.use_ui
@@ -1272,10 +3025,22 @@ class CAMERA_PT_Viewer(bpy.types.Panel):
 			col.alert = True
 			col.label(text='Cycles render is not supported', icon = "ERROR")
 
-		layout.operator("screen.rest_camera_viewer", icon = "FILE_REFRESH", text = "Rest Viewer")
+		layout.operator("screen.rest_camera_viewer", icon = "FILE_REFRESH", text = "Rest Viewer").index = index
 
 		layout.prop(camera_viewer, "active_camera", text="Active Camera Only")
 
+		row = layout.row(align=True)
+		row.operator("screen.capture_camera_viewer", icon = "RENDER_ANIMATION", text = "Stop Capture" if camera_viewer.as_pointer() in captures else "Capture").index = index
+		row.prop(camera_viewer, "capture_format", text="")
+		if camera_viewer.capture_format != 'IMAGE':
+			layout.prop(camera_viewer, "capture_directory", text="")
+
+		row = layout.row(heading="Contact Sheet")
+		row.prop(camera_viewer, "contact_sheet", text="")
+		sub = row.row()
+		sub.active = camera_viewer.contact_sheet
+		sub.prop(camera_viewer, "contact_sheet_rate", text="Per Redraw")
+
 		col = layout.column()
 
 		row = col.row(heading="Lock Camera")
@@ -1285,8 +3050,56 @@ class CAMERA_PT_Viewer(bpy.types.Panel):
 		row.prop(camera_viewer, "lock_camera", text="")
 		row = row.row()
 		row.enabled = camera_viewer.lock_camera
-		row.prop_search(camera_viewer, "camera", bpy.data, 'objects', text="")
+		row.prop(camera_viewer, "camera_object", text="")
 		col.prop(camera_viewer, "quality", text="Quality", slider=True)
+		row = col.row(align=True)
+		row.prop(camera_viewer, "upscale_filter", text="Upscale")
+		sub = row.row(align=True)
+		sub.active = camera_viewer.upscale_filter == 'SHARPEN'
+		sub.prop(camera_viewer, "sharpness", text="", slider=True)
+		row = col.row(align=True)
+		row.prop(camera_viewer, "color_mode", text="Color")
+		row.prop(camera_viewer, "value_check", text="", icon='IMAGE_ZDEPTH')
+		row.prop(camera_viewer, "false_color", text="", icon='COLOR')
+		row = col.row(align=True)
+		row.prop(camera_viewer, "scope", text="Scope")
+		sub = row.row(align=True)
+		sub.active = camera_viewer.scope != 'NONE'
+		sub.prop(camera_viewer, "scope_rate", text="Rate")
+		row = col.row()
+		row.active = context.scene.render.use_multiview and context.scene.render.views_format == 'STEREO_3D'
+		row.prop(camera_viewer, "stereo_mode", text="Stereo")
+		row = col.row(heading="Accumulate")
+		row.prop(camera_viewer, "accumulate", text="")
+		sub = row.row()
+		sub.active = camera_viewer.accumulate
+		sub.prop(camera_viewer, "accumulate_samples", text="Samples")
+		row = col.row(heading="Adaptive")
+		row.prop(camera_viewer, "adaptive_quality", text="")
+		sub = row.row()
+		sub.active = camera_viewer.adaptive_quality
+		sub.prop(camera_viewer, "target_time", text="Target ms")
+		row = col.row(align=True)
+		row.prop(camera_viewer, "max_fps", text="Max FPS")
+		row.prop(camera_viewer, "playback_step", text="Playback Step")
+		col.prop(camera_viewer, "fly_speed", text="Fly Speed")
+		row = col.row(align=True)
+		row.prop(camera_viewer, "filter_mode", text="Filter")
+		row.operator("screen.add_camera_viewer_filter", text="", icon='ADD')
+		if camera_viewer.filter_mode != 'NONE':
+			for filter_index, item in enumerate(camera_viewer.filters):
+				row = col.row(align=True)
+				row.prop(item, "collection", text="")
+				row.prop(item, "object", text="")
+				row.operator("screen.remove_camera_viewer_filter", text="", icon='X').index = filter_index
+		col.label(text=f"GPU Memory - {offscreen_memory()/1048576:.1f} MB")
+		camera_viewer_ui = context.scene.camera_viewer_ui
+		row = col.row(heading="Profiler", align=True)
+		row.prop(camera_viewer_ui, "use_profiler", text="")
+		sub = row.row(align=True)
+		sub.active = camera_viewer_ui.use_profiler
+		sub.prop(camera_viewer_ui, "profile_gpu", text="GPU Sync", toggle=True)
+		sub.operator("screen.export_camera_viewer_profile", text="", icon='EXPORT')
 		col.prop(camera_viewer, "position", text="Position")
 		row = col.row(align=True)
 		row.prop(camera_viewer, "x", text="X")
@@ -1296,6 +3109,18 @@ class CAMERA_PT_Viewer(bpy.types.Panel):
 		row = col.row()
 		row.prop(camera_viewer, "border_thickness", text="Thickness")
 		row.prop(camera_viewer, "border_color", text="")
+		col.label(text = 'Guides')
+		row = col.row(align=True)
+		row.prop(camera_viewer, "guide_thirds", text="Thirds", toggle=True)
+		row.prop(camera_viewer, "guide_golden", text="Golden", toggle=True)
+		row.prop(camera_viewer, "guide_safe_areas", text="Safe Areas", toggle=True)
+		row.prop(camera_viewer, "guide_color", text="")
+		row = col.row(heading="Letterbox")
+		row.prop(camera_viewer, "letterbox", text="")
+		sub = row.row(align=True)
+		sub.active = camera_viewer.letterbox
+		sub.prop(camera_viewer, "letterbox_aspect", text="Aspect")
+		sub.prop(camera_viewer, "letterbox_opacity", text="", slider=True)
 
 		row = layout.row(heading='Overlays')
 		row.prop(space.overlay, "show_overlays", text="", icon ='OVERLAY')
@@ -1415,7 +3240,7 @@ def camera_viewer_header(self, context):
 	row = layout.row(align=True)
 	row.prop(camera_viewer, "viewer_toggle", icon='VIEW_CAMERA' if camera_viewer.viewer_toggle else 'VIEW_CAMERA_UNSELECTED', text="")
 	sub = row.row(align=True)
-	sub.enabled = bool(bpy.data.screens.get(context.screen.name +' Camera Viewer'))
+	sub.enabled = bool(get_viewer_space(context.screen, camera_viewer))
 	sub.popover(panel="CAMERA_PT_Viewer", text="")
 
 def add_hotkey():
@@ -1454,6 +3279,7 @@ def remove_hotkey():
 addon_keymaps = []
 
 classes = (
+	 Camera_Viewer_Filter_Item,
 	 Camera_Viewer_Props,
 	 Camera_Viewer_UI_Props,
 	 Camera_Viewer_Navigation_Shape,
@@ -1462,8 +3288,14 @@ classes = (
 	 Modify_Camera_Viewer_OT,
 	 Navigation_Camera_Viewer_OT,
 	 Rest_Camera_Viewer_OT,
+	 Add_Camera_Viewer_OT,
+	 Remove_Camera_Viewer_OT,
+	 Add_Camera_Viewer_Filter_OT,
+	 Remove_Camera_Viewer_Filter_OT,
 	 Set_Camera_Viewer_Space_OT,
 	 Toggle_Camera_Viewer_OT,
+	 Capture_Camera_Viewer_OT,
+	 Export_Camera_Viewer_Profile_OT,
 	 CAMERA_VIEWER_OT_AddHotkey,
 )
 
@@ -1473,11 +3305,23 @@ def register():
 
 	bpy.types.Screen.camera_viewer = bpy.props.PointerProperty(type = Camera_Viewer_Props)
 
+	bpy.types.Screen.camera_viewers = bpy.props.CollectionProperty(type = Camera_Viewer_Props)
+
+	bpy.types.Screen.camera_viewer_index = bpy.props.IntProperty(name = 'Viewer', min = 0, get = get_viewer_index, set = set_viewer_index, description = "Camera Viewer shown in the settings panel")
+
 	bpy.types.Scene.camera_viewer_ui = bpy.props.PointerProperty(type = Camera_Viewer_UI_Props)
 
 	bpy.types.VIEW3D_HT_header.append(camera_viewer_header)
 
+	bpy.app.handlers.load_post.append(reset_viewer_states)
 	bpy.app.handlers.load_post.append(check_viewer_property)
+	bpy.app.handlers.depsgraph_update_post.append(tag_depsgraph_update)
+	bpy.app.handlers.frame_change_post.append(tag_frame_change)
+	bpy.app.handlers.undo_post.append(reset_viewer_spaces)
+	bpy.app.handlers.redo_post.append(reset_viewer_spaces)
+
+	subscribe_viewer_messages()
+	bpy.app.timers.register(register_viewer_screens, first_interval=0)
 
 	dns["draw_viewport_outline"] = bpy.types.SpaceView3D.draw_handler_add(draw_viewport_outline, (), 'WINDOW', 'POST_PIXEL')
 
@@ -1486,18 +3330,55 @@ def register():
 def unregister():
 	remove_hotkey()
 
+	for capture in captures.values():
+		capture.stop()
+	captures.clear()
+
+	# Filter layers are saved with the file, don't leave them behind without the add-on.
+	for screen in bpy.data.screens:
+		for camera_viewer in get_viewers(screen):
+			remove_filter_layers(camera_viewer)
+
+	# A timer left pending would call back into the unloaded module.
+	for timer in (tag_viewer_redraw, sync_filter_layers, register_viewer_screens):
+		if bpy.app.timers.is_registered(timer):
+			bpy.app.timers.unregister(timer)
+	for state in viewer_states.values():
+		cancel_viewer_redraw(state)
+
+	bpy.msgbus.clear_by_owner(msgbus_owner)
+
+	bpy.app.handlers.redo_post.remove(reset_viewer_spaces)
+	bpy.app.handlers.undo_post.remove(reset_viewer_spaces)
+	bpy.app.handlers.frame_change_post.remove(tag_frame_change)
+	bpy.app.handlers.depsgraph_update_post.remove(tag_depsgraph_update)
+	bpy.app.handlers.load_post.remove(check_viewer_property)
+	bpy.app.handlers.load_post.remove(reset_viewer_states)
+
 	if dns.get("draw_viewport_outline"):
 
 		bpy.types.SpaceView3D.draw_handler_remove(dns["draw_viewport_outline"], 'WINDOW')
 
 	if dns.get("draw_viewer_toggle"):
 
-		bpy.types.SpaceView3D.draw_handler_remove(dns["draw_viewer_toggle"], 'WINDOW')
+		bpy.types.SpaceView3D.draw_handler_remove(dns.pop("draw_viewer_toggle"), 'WINDOW')
 
 	bpy.types.VIEW3D_HT_header.remove(camera_viewer_header)
 
+	free_shaders()
+	free_offscreens()
+	batch_cache.clear()
+	space_cache.clear()
+	viewer_states.clear()
+	layout_cache.clear()
+	hit_indices.clear()
+
 	del bpy.types.Scene.camera_viewer_ui
 
+	del bpy.types.Screen.camera_viewer_index
+
+	del bpy.types.Screen.camera_viewers
+
 	del bpy.types.Screen.camera_viewer
 	
 	for km, kmi in addon_keymaps: